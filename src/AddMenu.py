@@ -1,4 +1,3 @@
-import os
 import pygame
 import json
 import request_helper
@@ -36,15 +35,10 @@ class AddMenu:
         if self.active_tab == "Level":
             self.local_items = save_manager.list_custom_levels()
         else:
-            self.local_items = []
-            path = save_manager.get_save_dir()
-            for f in os.listdir(path):
-                if f.endswith(".json"):
-                    self.local_items.append({
-                        "name": f[:-5],
-                        "description": "Machine save file",
-                        "path": os.path.join(path, f)
-                    })
+            self.local_items = [
+                {"name": save["name"], "description": "Machine save file", "path": save["path"]}
+                for save in save_manager.list_saves()
+            ]
         self.selected_item = None
         self.message = ""
         self.scroll_offset = 0
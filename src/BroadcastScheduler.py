@@ -0,0 +1,40 @@
+import threading
+import time
+
+
+class BroadcastScheduler:
+    def __init__(self, send, rate=10):
+        self.send = send
+        self.interval = 1 / rate
+        self.pending = False
+        self.last_sent = None
+        self.sent = 0
+        self.coalesced = 0
+        self._lock = threading.Lock()
+
+    def _due(self):
+        return self.last_sent is None or time.monotonic() - self.last_sent >= self.interval
+
+    def request(self):
+        with self._lock:
+            if self.pending:
+                self.coalesced += 1
+            self.pending = True
+        if self._due():
+            self.flush()
+
+    def update(self):
+        if self.pending and self._due():
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            if not self.pending:
+                return
+            self.pending = False
+            self.last_sent = time.monotonic()
+            self.sent += 1
+            self.send()
+
+    def stats(self):
+        return {"sent": self.sent, "coalesced": self.coalesced}
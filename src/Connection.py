@@ -2,10 +2,12 @@ import pygame
 import math
 from MainMenu import COLORS
 from FontManager import FontManager
+from identifiers import new_uid
 
 
 class Connection:
     def __init__(self, start_node, end_node, read=None, write=None, move=None, read2=None, write2=None, move2=None):
+        self.uid = new_uid()
         self.start = start_node
         self.end = end_node
 
@@ -22,48 +24,93 @@ class Connection:
         self.thickness = 3
         self.curvature = 60
         self.arrow_size = 10
-        self.font = FontManager.get(18)
+        self.font_size = 18
 
-    def draw(self, screen, grid):
-        start_world = self.start.pos
-        end_world = self.end.pos
+        self._geometry = None
+        self._geometry_key = None
 
+    def draw(self, screen, grid):
         if self.start == self.end:
             self._draw_self_loop(screen, grid)
         else:
-            self._draw_curve(screen, grid, start_world, end_world)
+            self._draw_curve(screen, grid)
 
-    def _draw_curve(self, screen, grid, start_world, end_world):
-        mid = (start_world + end_world) / 2
+    def get_geometry(self):
+        start_world = self.start.pos
+        end_world = self.end.pos
+        key = (start_world.x, start_world.y, end_world.x, end_world.y, self.curvature, self.start.radius)
+        if key != self._geometry_key:
+            self._geometry = self._build_loop_geometry() if self.start == self.end else self._build_curve_geometry()
+            self._geometry_key = key
+        return self._geometry
+
+    def _build_curve_geometry(self):
+        start_world = self.start.pos
+        end_world = self.end.pos
         direction = (end_world - start_world)
         if direction.length() == 0:
-            return
+            return None
+        mid = (start_world + end_world) / 2
         normal = pygame.Vector2(-direction.y, direction.x).normalize()
         control_world = mid + normal * self.curvature
 
-        world_points = []
+        points = []
         for t in [i / 30 for i in range(31)]:
             p = (1 - t) ** 2 * start_world + 2 * (1 - t) * t * control_world + t ** 2 * end_world
-            world_points.append(p)
+            points.append((p.x, p.y))
+
+        label_dir = control_world - pygame.Vector2(points[len(points) // 2])
+        return {
+            "points": points,
+            "control": control_world,
+            "label_dir": label_dir.normalize() if label_dir.length() > 0 else pygame.Vector2(0, -1),
+            "bbox": self._bounds(points),
+        }
+
+    def _build_loop_geometry(self):
+        pos_world = self.start.pos
+        r = self.start.radius
+        offset = 25
+        gap = 10
+
+        start = pygame.Vector2(pos_world.x, pos_world.y - r)
+        top = pygame.Vector2(start.x, start.y - offset)
+        left = pygame.Vector2(start.x - r - gap, start.y - offset)
+        bottom = pygame.Vector2(left.x, pos_world.y - r / 2)
+        points = [(p.x, p.y) for p in (start, top, left, bottom, pos_world)]
+
+        hit_r = r + 20
+        return {
+            "points": points,
+            "label": (left.x + (start.x - left.x) / 2, top.y - 15),
+            "bbox": (pos_world.x - hit_r, pos_world.y - hit_r * 2, pos_world.x + hit_r, pos_world.y),
+        }
 
-        screen_points = [grid.world_to_screen(p) for p in world_points]
+    @staticmethod
+    def _bounds(points):
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return min(xs), min(ys), max(xs), max(ys)
+
+    def _draw_curve(self, screen, grid):
+        geometry = self.get_geometry()
+        if geometry is None:
+            return
+
+        screen_points = grid.world_to_screen_points(geometry["points"])
 
         pygame.draw.lines(screen, self.color, False, screen_points, self.thickness)
 
         mid_index = len(screen_points) // 2
-        prev_mid = screen_points[mid_index - 1]
-        mid_point = screen_points[mid_index]
+        prev_mid = pygame.Vector2(screen_points[mid_index - 1])
+        mid_point = pygame.Vector2(screen_points[mid_index])
         self._draw_arrowhead(screen, mid_point, prev_mid, color=(180, 220, 255))
 
         label_text = self._make_label_text()
         if label_text:
-            label_surface = self.font.render(label_text, True, COLORS["text"])
+            label_surface = FontManager.render(label_text, self.font_size, COLORS["text"])
 
-            offset_dir = (grid.world_to_screen(control_world) - mid_point)
-            if offset_dir.length() > 0:
-                base_offset = offset_dir.normalize() * 20
-            else:
-                base_offset = pygame.Vector2(0, -20)
+            base_offset = geometry["label_dir"] * 20
 
             offset_index = getattr(self, "offset_index", 0)
             total_between = getattr(self, "total_between_same", 1)
@@ -76,25 +123,15 @@ class Connection:
             screen.blit(label_surface, label_rect)
 
     def _draw_self_loop(self, screen, grid):
-        pos_world = self.start.pos
-        r = self.start.radius
-        offset = 25
-        gap = 10
-
-        start = pygame.Vector2(pos_world.x, pos_world.y - r)
-        top = pygame.Vector2(start.x, start.y - offset)
-        left = pygame.Vector2(start.x - r - gap, start.y - offset)
-        bottom = pygame.Vector2(left.x, pos_world.y - r / 2)
-        world_points = [start, top, left, bottom, pos_world]
-
-        screen_points = [grid.world_to_screen(p) for p in world_points]
+        geometry = self.get_geometry()
+        screen_points = grid.world_to_screen_points(geometry["points"])
 
         pygame.draw.lines(screen, self.color, False, screen_points, self.thickness)
 
         label_text = self._make_label_text()
         if label_text:
-            label_surface = self.font.render(label_text, True, COLORS["text"])
-            sx, sy = grid.world_to_screen(pygame.Vector2(left.x + (start.x - left.x) / 2, top.y - 15))
+            label_surface = FontManager.render(label_text, self.font_size, COLORS["text"])
+            sx, sy = grid.world_to_screen_points([geometry["label"]])[0]
             label_rect = label_surface.get_rect(center=(sx, sy))
             label_rect.y -= self.label_offset
             screen.blit(label_surface, label_rect)
@@ -145,34 +182,33 @@ class Connection:
             self.move2 = move2
 
     def is_clicked(self, pos, grid, tolerance=8):
-        start_world = self.start.pos
-        end_world = self.end.pos
+        geometry = self.get_geometry()
+        if geometry is None:
+            return False
 
+        click_world = grid.screen_to_world(pos)
+        minx, miny, maxx, maxy = geometry["bbox"]
         if self.start == self.end:
-            r = self.start.radius + 20
-            loop_rect = pygame.Rect(
-                start_world.x - r, start_world.y - r * 2, r * 2, r * 2
-            )
-            return loop_rect.collidepoint(grid.screen_to_world(pos))
+            return minx <= click_world.x < maxx and miny <= click_world.y < maxy
 
-        mid = (start_world + end_world) / 2
-        direction = (end_world - start_world)
-        if direction.length() == 0:
+        reach = tolerance / grid.zoom
+        if not (minx - reach <= click_world.x <= maxx + reach and miny - reach <= click_world.y <= maxy + reach):
             return False
-        normal = pygame.Vector2(-direction.y, direction.x).normalize()
-        control = mid + normal * self.curvature
-
-        click_world = grid.screen_to_world(pos)
-        for t in [i / 30 for i in range(31)]:
-            p = (1 - t) ** 2 * start_world + 2 * (1 - t) * t * control + t ** 2 * end_world
-            if (p - click_world).length() <= tolerance / grid.zoom:
+        reach_sq = reach * reach
+        cx, cy = click_world.x, click_world.y
+        for x, y in geometry["points"]:
+            if (x - cx) ** 2 + (y - cy) ** 2 <= reach_sq:
                 return True
         return False
 
     @classmethod
     def from_dict(cls, conn_data, nodes):
-        start_node = next((n for n in nodes if n.id == conn_data["start_id"]), None)
-        end_node = next((n for n in nodes if n.id == conn_data["end_id"]), None)
+        if "start_uid" in conn_data and "end_uid" in conn_data:
+            start_node = next((n for n in nodes if n.uid == conn_data["start_uid"]), None)
+            end_node = next((n for n in nodes if n.uid == conn_data["end_uid"]), None)
+        else:
+            start_node = next((n for n in nodes if n.id == conn_data["start_id"]), None)
+            end_node = next((n for n in nodes if n.id == conn_data["end_id"]), None)
         if not start_node or not end_node:
             return None
 
@@ -186,12 +222,16 @@ class Connection:
             write2=conn_data.get("write2"),
             move2=conn_data.get("move2")
         )
+        connection.uid = conn_data.get("uid") or connection.uid
         return connection
 
     def to_dict(self):
         return {
+            "uid": self.uid,
             "start_id": self.start.id,
             "end_id": self.end.id,
+            "start_uid": self.start.uid,
+            "end_uid": self.end.uid,
             "read": self.read,
             "write": self.write,
             "move": self.move,
@@ -1,3 +1,5 @@
+import time
+
 import pygame
 
 import save_manager
@@ -9,6 +11,8 @@ from Tape import Tape
 from MainMenu import COLORS
 from Toolbox import Toolbox
 from Grid import Grid
+from SpatialIndex import SpatialIndex
+from BroadcastScheduler import BroadcastScheduler
 from Connection import Connection
 from ConnectionWindow import ConnectionWindow
 from TuringMachine import TuringMachine
@@ -17,6 +21,10 @@ from TutorialHelper import TutorialHelper
 from FontManager import FontManager
 from SubmitPopup import SubmitPopup
 import request_helper
+import simulator
+
+RESYNC_RETRY = 3.0
+BROADCAST_RATE = 10
 
 
 class Environment:
@@ -27,6 +35,12 @@ class Environment:
         self.is_host = is_host
         self.lobby_code = lobby_code
         self.player_name = request_helper.get_username() if multiplayer else None
+        self.sync_seq = 0
+        self.pending_ops = []
+        self.snapshot_needed = False
+        self.resync_requested_at = None
+        self.snapshot_at = None
+        self.broadcaster = BroadcastScheduler(self._send_state, BROADCAST_RATE)
         self.sandbox_alphabet = sandbox_alphabet or ["0", "1", "_"]
         if level is not None:
             if hasattr(level, "level_type") and not hasattr(level, "type"):
@@ -47,10 +61,10 @@ class Environment:
         self.alphabet = self.level.alphabet
         self.screen = screen
         if self.level.double_tape:
-            self.tape = Tape(screen, base_y_ratio=0.75)
-            self.tape2 = Tape(screen)
+            self.tape = Tape(screen, base_y_ratio=0.75, alphabet=self.alphabet)
+            self.tape2 = Tape(screen, alphabet=self.alphabet)
         else:
-            self.tape = Tape(screen)
+            self.tape = Tape(screen, alphabet=self.alphabet)
             self.tape2 = None
         self.running = True
         self.toolbox = Toolbox(screen, self.on_tool_selected)
@@ -60,6 +74,15 @@ class Environment:
         self.nodes = []
         Node._id_counter = 0
         self.connections = []
+        self.node_index = SpatialIndex()
+        self.edge_index = SpatialIndex()
+        self.node_edges = {}
+        self.active_nodes = set()
+        self.graph_version = 0
+        self.background = None
+        self.background_key = None
+        self.last_dirty_rects = []
+        self.hud_rect = None
         self.TuringMachine = TuringMachine(screen, self.nodes, self.connections, self.tape, self.tape2, self.level.double_tape, alphabet=self.level.alphabet)
 
         self.current_tool = None
@@ -67,6 +90,11 @@ class Environment:
         self.mouse_pos = pygame.Vector2(0, 0)
 
         self.test_results = []
+        self.test_reports = []
+        self.test_total = 0
+        self.grading_jobs = []
+        self.grading_generation = 0
+        self.grading_machine = None
         self.test_complete = False
         self.all_passed = False
 
@@ -114,6 +142,11 @@ class Environment:
         self.wasLoaded = False
 
     def update(self, dt):
+        self._poll_level_tests()
+        if self.snapshot_at is not None and time.monotonic() >= self.snapshot_at:
+            self.snapshot_at = None
+            self.send_snapshot()
+        self.broadcaster.update()
         self.TuringMachine.update(dt)
         if self.TuringMachine.alphabet != self.alphabet:
             self.TuringMachine.alphabet = self.alphabet
@@ -135,22 +168,35 @@ class Environment:
             self.pause_menu.update()
             return
 
+    def is_busy(self):
+        tm = self.TuringMachine
+        if self.grading_jobs or self.broadcaster.pending or (tm.running and not tm.paused):
+            return True
+        if tm.current_width != (tm.target_width if tm.open else 0):
+            return True
+        if self.toolbox.animation_locked or 0 < self.toolbox.hover_label_alpha < 255:
+            return True
+        return any(tape.animating or abs(tape.offset - tape.target_offset) > 1 for tape in (self.tape, self.tape2) if tape)
+
     def on_tool_selected(self, tool_name):
         self.current_tool = tool_name
         self.connecting_from = None
         self.toolbox.draw()
 
     def draw(self):
-        self.screen.fill(COLORS["background"])
-        self.grid.draw()
+        dynamic = self._dynamic_nodes()
+        moving_edges = {c for n in dynamic if n.dragging for c in self.node_edges.get(n, [])}
+        rebuilt = self._update_background(moving_edges)
+        self.screen.blit(self.background, (0, 0))
         screen_w, _ = self.screen.get_size()
         if self.level.type != "sandbox":
             self.submit_button.rect.topleft = (screen_w - 220, 60)
 
-        for conn in self.connections:
+        for conn in moving_edges:
             conn.draw(self.screen, self.grid)
-        for node in self.nodes:
-            node.draw(self.screen, self.grid)
+        for node in self.node_index.query_rect(*self.grid.visible_world_rect(margin=150 / self.grid.zoom)):
+            if node in dynamic:
+                node.draw(self.screen, self.grid)
         if self.current_tool == "connect" and self.connecting_from is not None:
             self._draw_preview_connection()
 
@@ -181,7 +227,77 @@ class Environment:
         if self.submit_popup:
             self.submit_popup.draw()
 
+        if rebuilt or self._needs_full_redraw():
+            self.last_dirty_rects = []
+            return None
+        dirty = self._overlay_rects(dynamic, moving_edges)
+        rects = dirty + self.last_dirty_rects
+        self.last_dirty_rects = dirty
+        return rects
+
+    def _dynamic_nodes(self):
+        current = self.TuringMachine.current_node
+        candidates = self.active_nodes | ({current} if current is not None else set())
+        return {n for n in candidates if n.is_active or n.hovered or n.selected or n.dragging}
+
+    def _update_background(self, moving_edges):
+        size = self.screen.get_size()
+        key = (size, self.grid.offset.x, self.grid.offset.y, self.grid.zoom, self.graph_version)
+        if key == self.background_key:
+            return False
+
+        if self.background is None or self.background.get_size() != size:
+            self.background = pygame.Surface(size)
+        self.background.fill(COLORS["background"])
+        self.grid.draw(self.background)
+
+        view = self.grid.visible_world_rect(margin=150 / self.grid.zoom)
+        for conn in self.edge_index.query_rect(*view):
+            if conn not in moving_edges:
+                conn.draw(self.background, self.grid)
+        for node in self.node_index.query_rect(*view):
+            if not node.dragging:
+                node.draw(self.background, self.grid, plain=True)
+        self.background_key = key
+        return True
+
+    def _needs_full_redraw(self):
+        return (self.paused or self.save_menu.visible or self.submit_popup is not None
+                or self.connection_window is not None or self.TuringMachine.input_active
+                or (self.tutorial is not None and self.tutorial.visible))
+
+    def _overlay_rects(self, dynamic, moving_edges):
+        rects = []
+        for node in dynamic:
+            center = self.grid.world_to_screen(node.pos)
+            radius = node.radius * self.grid.zoom + 6
+            rects.append(pygame.Rect(center.x - radius, center.y - radius, radius * 2, radius * 2))
+        for conn in moving_edges:
+            geometry = conn.get_geometry()
+            if geometry is None:
+                continue
+            minx, miny, maxx, maxy = geometry["bbox"]
+            (x0, y0), (x1, y1) = self.grid.world_to_screen_points([(minx, miny), (maxx, maxy)])
+            rects.append(pygame.Rect(x0, y0, x1 - x0, y1 - y0).inflate(240, 80))
+        if self.current_tool == "connect" and self.connecting_from is not None:
+            start = self.grid.world_to_screen(self.connecting_from.pos)
+            rects.append(pygame.Rect(min(start.x, self.mouse_pos.x), min(start.y, self.mouse_pos.y),
+                                     abs(start.x - self.mouse_pos.x), abs(start.y - self.mouse_pos.y)).inflate(140, 140))
+
+        for tape in (self.tape, self.tape2):
+            if tape is not None and tape.visible:
+                rects.append(tape.get_rect())
+        rects.append(self.TuringMachine.toggle_rect)
+        if self.TuringMachine.panel_rect:
+            rects.append(self.TuringMachine.panel_rect.inflate(12, 12))
+        rects.append(self.toolbox.get_rect())
+        if self.hud_rect:
+            rects.append(self.hud_rect)
+        return rects
+
     def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.TuringMachine.dragging_slider = False
         if self.submit_popup:
             self.submit_popup.handle_event(event)
             return
@@ -226,6 +342,7 @@ class Environment:
                                 new_node.id = 0
                             self.nodes.append(new_node)
                             self._sync_machine()
+                            self._record_op({"op": "add_node", "node": new_node.to_dict()})
                             self._broadcast_state()
                         else:
                             self._propose_node(pos, self.current_tool == "end_node")
@@ -270,17 +387,75 @@ class Environment:
                 self.pause_menu.show()
             return
 
-        for node in self.nodes:
+        self._dispatch_node_event(event)
+
+    def _dispatch_node_event(self, event):
+        if event.type not in (pygame.MOUSEMOTION, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP):
+            return
+
+        candidates = set(self.node_index.query_point(event.pos[0], event.pos[1])) | self.active_nodes
+        moved = []
+        for node in candidates:
+            was_dragging = node.dragging
             node.handle_event(event)
+            if node.dragging:
+                self._index_node(node)
+            elif was_dragging:
+                moved.append(node)
+            if node.dragging != was_dragging:
+                self.graph_version += 1
+        self.active_nodes = {n for n in candidates if n.hovered or n.selected or n.dragging}
+
+        if moved and self.multiplayer and self.is_host:
+            for node in moved:
+                self._record_op({"op": "move_node", "uid": node.uid, "x": node.pos.x, "y": node.pos.y})
+            self._broadcast_state()
+        elif moved and self.multiplayer:
+            for node in moved:
+                self._propose_move(node)
+
+    def _index_node(self, node):
+        r = node.radius
+        self.node_index.insert(node, (node.pos.x - r, node.pos.y - r, node.pos.x + r, node.pos.y + r))
+        for conn in self.node_edges.get(node, []):
+            geometry = conn.get_geometry()
+            if geometry is None:
+                self.edge_index.remove(conn)
+            else:
+                self.edge_index.insert(conn, geometry["bbox"])
+
+    def _rebuild_spatial_index(self):
+        self.graph_version += 1
+        self.node_index.clear()
+        self.edge_index.clear()
+        self.node_edges = {}
+        for conn in self.connections:
+            if conn is None:
+                continue
+            self.node_edges.setdefault(conn.start, []).append(conn)
+            if conn.end is not conn.start:
+                self.node_edges.setdefault(conn.end, []).append(conn)
+            geometry = conn.get_geometry()
+            if geometry is not None:
+                self.edge_index.insert(conn, geometry["bbox"])
+        for node in self.nodes:
+            r = node.radius
+            self.node_index.insert(node, (node.pos.x - r, node.pos.y - r, node.pos.x + r, node.pos.y + r))
+        self.active_nodes &= set(self.nodes)
 
     def _get_node_at(self, pos, world_space=False):
-        for node in reversed(self.nodes):
-            if world_space:
-                if node.is_inside(pos):
-                    return node
-            else:
-                if node.is_inside(pos, self.grid):
-                    return node
+        if not world_space:
+            pos = self.grid.screen_to_world(pos)
+        for node in reversed(self.node_index.query_point(pos[0], pos[1])):
+            if node.is_inside(pos):
+                return node
+        return None
+
+    def _get_connection_at(self, pos, tolerance=8):
+        world = self.grid.screen_to_world(pos)
+        for conn in self.edge_index.query_point(world.x, world.y, tolerance / self.grid.zoom):
+            if conn.is_clicked(pos, self.grid, tolerance):
+                return conn
         return None
 
     def _create_connection(self, start_node, end_node):
@@ -321,7 +496,7 @@ class Environment:
         end = new_conn.end
 
         if self.multiplayer and not self.is_host:
-            self._propose_connection(start.id, end.id, read, write, move, read2, write2, move2)
+            self._propose_connection(start, end, read, write, move, read2, write2, move2)
             self.connection_window = None
             return
 
@@ -351,6 +526,7 @@ class Environment:
         self.connection_window = None
 
         if self.multiplayer and self.is_host:
+            self._record_op({"op": "add_connection", "connection": new_conn.to_dict()})
             self._broadcast_state()
 
     def _cancel_connection_window(self, conn):
@@ -386,6 +562,7 @@ class Environment:
         if node:
             if self.multiplayer:
                 if self.is_host:
+                    self._record_op({"op": "delete_node", "uid": node.uid})
                     self._delete_node(node)
                     self._sync_machine()
                     self._broadcast_state()
@@ -396,19 +573,19 @@ class Environment:
                 self._sync_machine()
             return
 
-        for conn in self.connections:
-            if conn.is_clicked(pos, self.grid):
-                if self.multiplayer:
-                    if self.is_host:
-                        self.connections.remove(conn)
-                        self._sync_machine()
-                        self._broadcast_state()
-                    else:
-                        self._propose_delete(conn)
-                else:
+        conn = self._get_connection_at(pos)
+        if conn:
+            if self.multiplayer:
+                if self.is_host:
+                    self._record_op({"op": "delete_connection", "uid": conn.uid})
                     self.connections.remove(conn)
                     self._sync_machine()
-                return
+                    self._broadcast_state()
+                else:
+                    self._propose_delete(conn)
+            else:
+                self.connections.remove(conn)
+                self._sync_machine()
 
     def _delete_node(self, node):
         self.nodes.remove(node)
@@ -422,8 +599,11 @@ class Environment:
         self._sync_machine()
 
     def _sync_machine(self):
+        self._cancel_level_tests()
         self.TuringMachine.nodes = self.nodes
         self.TuringMachine.connections = self.connections
+        self.TuringMachine.compile_transitions()
+        self._rebuild_spatial_index()
         if self.TuringMachine.current_node not in self.nodes and len(self.nodes) > 0:
             self.TuringMachine.current_node = next((n for n in self.nodes if getattr(n, "is_start", False)), None)
 
@@ -434,8 +614,11 @@ class Environment:
         desc_text = desc_font.render(self.level.description, True, COLORS["text"])
         name_x = self.screen.get_width() - 20 - name_text.get_width()
         desc_x = self.screen.get_width() - 20 - desc_text.get_width()
-        self.screen.blit(name_text, (name_x, 20))
-        self.screen.blit(desc_text, (desc_x, 40))
+        self.hud_rect = self.screen.blit(name_text, (name_x, 20)).union(self.screen.blit(desc_text, (desc_x, 40)))
+        if self.level.type != "sandbox":
+            bar_x = self.screen.get_width() - 230
+            self.hud_rect.union_ip(pygame.Rect(bar_x, 60, self.screen.get_width() - bar_x, 220))
+            self.hud_rect.union_ip(self.submit_button.rect)
 
     def _draw_level_progress(self):
         if self.level.mode == "accept" and not (self.level.correct_examples or self.level.wrong_examples):
@@ -451,15 +634,36 @@ class Environment:
 
         if self.test_results:
             passed = sum(1 for r in self.test_results if r)
-            pct = passed / len(self.test_results)
+            pct = passed / max(self.test_total, len(self.test_results))
             pygame.draw.rect(self.screen, (90, 200, 90), (bar_x, bar_y, bar_width * pct, bar_height), border_radius=6)
 
+        if self.grading_jobs:
+            font = FontManager.get(18, False)
+            text = font.render(f"Grading {len(self.test_results)}/{self.test_total}...", True, COLORS["text"])
+            self.screen.blit(text, (bar_x, bar_y + 20))
+
         if self.test_complete:
             font = FontManager.get(22)
             status = "Level Passed" if self.all_passed else "Level Incomplete"
             color = (120, 220, 120) if self.all_passed else (220, 100, 100)
             text = font.render(status, True, color)
             self.screen.blit(text, (bar_x, bar_y + 20))
+            self._draw_test_report(bar_x, bar_y + 50)
+
+    def _draw_test_report(self, x, y):
+        font = FontManager.get(16, False)
+        failed = [r for r in self.test_reports if not r["passed"]]
+        total_steps = sum(r["steps"] for r in self.test_reports)
+        summary = font.render(f"{len(self.test_reports) - len(failed)}/{len(self.test_reports)} passed, {total_steps} steps", True, COLORS["text"])
+        self.screen.blit(summary, (x, y))
+
+        for i, report in enumerate(failed[:5]):
+            word = report["input"] or "(empty)"
+            line = font.render(f"{word}: {report['reason']} after {report['steps']} steps", True, (220, 100, 100))
+            self.screen.blit(line, (x, y + 20 * (i + 1)))
+        if len(failed) > 5:
+            more = font.render(f"+{len(failed) - 5} more", True, (220, 100, 100))
+            self.screen.blit(more, (x, y + 20 * 6))
 
     def _run_level_tests(self):
         if self.level.mode == "accept" and not (self.level.correct_examples or self.level.wrong_examples):
@@ -467,22 +671,58 @@ class Environment:
         if self.level.mode == "transform" and not getattr(self.level, "transform_tests", []):
             return
 
+        self._cancel_level_tests()
         self.test_results.clear()
+        self.test_reports = []
         self.test_complete = False
         self.all_passed = False
-        if self.level.mode == "accept":
-
-            for example in self.level.wrong_examples:
-                result = self._simulate(example, should_accept=False)
-                self.test_results.append(result)
+        self.grading_machine = self.TuringMachine.serialize(self.level.name)
+        self.test_total = len(simulator.level_cases(self.level))
+        try:
+            self.grading_jobs = [(self.grading_generation, job)
+                                 for job in simulator.submit_level(self.grading_machine, self.level)]
+        except Exception as e:
+            print("Could not start parallel grading:", e)
+            self._grade_inline()
+
+    def _grade_inline(self):
+        for _, job in self.grading_jobs:
+            job.cancel()
+        self.grading_jobs = []
+        simulator.shutdown_pool()
+        self.test_reports = simulator.grade_level(self.grading_machine, self.level)
+        self.test_results[:] = [report["passed"] for report in self.test_reports]
+        self._finish_level_tests()
+
+    def _poll_level_tests(self):
+        for entry in [e for e in self.grading_jobs if e[0] != self.grading_generation or e[1].done()]:
+            self.grading_jobs.remove(entry)
+            generation, job = entry
+            if generation != self.grading_generation:
+                continue
+            try:
+                reports = job.result()
+            except Exception as e:
+                print("Grading worker failed, grading inline:", e)
+                self._grade_inline()
+                return
+            self.test_reports.extend(reports)
+            self.test_results.extend(report["passed"] for report in reports)
+            if not any(g == self.grading_generation for g, _ in self.grading_jobs):
+                self._finish_level_tests()
 
-            for example in self.level.correct_examples:
-                result = self._simulate(example, should_accept=True)
-                self.test_results.append(result)
-        else:
-            for case in self.level.transform_tests:
-                self.test_results.append(self._simulate_transform(case["input"], case["output"]))
+    def _cancel_level_tests(self):
+        if not self.grading_jobs:
+            return
+        self.grading_generation += 1
+        running = [job for _, job in self.grading_jobs if not job.cancel() and not job.done()]
+        self.grading_jobs = []
+        if running:
+            simulator.shutdown_pool()
+        self.test_results.clear()
+        self.test_reports = []
 
+    def _finish_level_tests(self):
         total = len(self.test_results)
         passed = sum(1 for r in self.test_results if r)
         self.all_passed = (total > 0 and passed == total)
@@ -499,7 +739,7 @@ class Environment:
                     self.last_completion_time = None
                 self.last_completion_time = time_seconds
 
-            self.level.solution = self.TuringMachine.serialize(self.level.name)
+            self.level.solution = self.grading_machine
             if not self.wasLoaded:
                 save_manager.mark_level_complete(self.level.name, self.level.solution, self.last_completion_time)
                 self._open_submit_popup()
@@ -547,23 +787,6 @@ class Environment:
             on_cancel=cancel_submit
         )
 
-    def _simulate(self, input_string, should_accept=True):
-        if not self.nodes or not any(n.is_start for n in self.nodes):
-            accepted = getattr(self.TuringMachine.current_node, "is_end", False)
-            return False
-
-        self.tape.change_tape(input_string)
-        self.TuringMachine.reset()
-        self.TuringMachine.play()
-
-        for _ in range(200):
-            self.TuringMachine.step()
-            if self.TuringMachine.finished:
-                break
-        accepted = getattr(self.TuringMachine.current_node, "is_end", False)
-        #print("Input: ", input_string, " Accepted: ", accepted, " Expected: ", should_accept)
-        return accepted if should_accept else not accepted
-
     def _resume(self):
         self.paused = False
         self.pause_menu.hide()
@@ -577,12 +800,16 @@ class Environment:
         is_workshop = isinstance(save, dict) and save.get("workshop", False)
 
         data = save_manager.load_machine(name, workshop=is_workshop)
+        self._cancel_level_tests()
         Node._id_counter = 0
         self.TuringMachine.deserialize(data)
+        self._rebuild_spatial_index()
         self.wasLoaded = True
+        self.send_snapshot()
 
     def _return_to_menu(self):
         if self.multiplayer:
+            self.broadcaster.flush()
             try:
                 code = self.lobby_code
                 request_helper.leave_signalr_group(code)
@@ -590,6 +817,7 @@ class Environment:
                 print("[Multiplayer] Failed to leave lobby gracefully")
             self.multiplayer_left = True
 
+        self._cancel_level_tests()
         self.back_to_menu = True
         self.paused = False
         self.pause_menu.hide()
@@ -600,44 +828,36 @@ class Environment:
         pygame.event.post(pygame.event.Event(pygame.QUIT))
 
 
-    def _simulate_transform(self, input_string, expected_output):
-        self.tape.change_tape(input_string)
-        self.TuringMachine.reset()
-        self.TuringMachine.play()
-
-        for _ in range(400):
-            self.TuringMachine.step()
-            if self.TuringMachine.finished:
-                break
-        if self.level.double_tape:
-            result = self.tape2.get_tape_string().strip("_")
-        else:
-            result = self.tape.get_tape_string().strip("_")
-        #print("Input: ", input_string, " Output: ", result, " Expected: ", expected_output)
-        return result == expected_output
-
     def load_solution(self, solution):
+        self._cancel_level_tests()
         Node.id_counter = 0
         self.TuringMachine.deserialize(solution)
+        self._rebuild_spatial_index()
         self.wasLoaded = True
+        self.send_snapshot()
 
     def _clear_space(self):
+        self._cancel_level_tests()
         self.nodes.clear()
         self.connections.clear()
         Node._id_counter = 0
         self.TuringMachine.reset()
         self.TuringMachine.nodes = self.nodes
         self.TuringMachine.connections = self.connections
+        self.TuringMachine.compile_transitions()
+        self._rebuild_spatial_index()
         self.TuringMachine.current_node = None
         self.TuringMachine.playing = False
         self.TuringMachine.open = False
         self.test_results.clear()
+        self.test_reports = []
         self.test_complete = False
         self.all_passed = False
         self.paused = False
         self.pause_menu.hide()
         self.level_attempt_start_time = pygame.time.get_ticks()
         self.wasLoaded = False
+        self.send_snapshot()
 
 
     def _levelmenu(self):
@@ -646,16 +866,41 @@ class Environment:
         self.paused = False
         self.pause_menu.hide()
 
+    def _record_op(self, op):
+        if self.multiplayer and self.is_host:
+            self.pending_ops.append(op)
+
+    def schedule_snapshot(self, delay):
+        self.snapshot_at = time.monotonic() + delay
+
+    def send_snapshot(self):
+        if self.multiplayer and self.is_host:
+            self.snapshot_needed = True
+            self._broadcast_state()
+
     def _broadcast_state(self):
         if self.multiplayer and self.is_host:
-            state = self.serialize_state()
-            request_helper.send_environment_state(self.lobby_code, state)
+            self.broadcaster.request()
+
+    def _send_state(self):
+        if self.snapshot_needed:
+            state = {"snapshot": self.serialize_state()}
+        elif self.pending_ops:
+            state = {"ops": self.pending_ops}
+        else:
+            return
+
+        self.sync_seq += 1
+        state["seq"] = self.sync_seq
+        self.pending_ops = []
+        self.snapshot_needed = False
+        request_helper.send_environment_state(self.lobby_code, state)
 
     def _propose_node(self, pos, is_end):
         if self.multiplayer and not self.is_host:
             request_helper.propose_node(self.lobby_code, pos, is_end)
 
-    def _propose_connection(self, start_id, end_id, read, write, move, read2=None, write2=None, move2=None):
+    def _propose_connection(self, start, end, read, write, move, read2=None, write2=None, move2=None):
         if self.multiplayer and not self.is_host:
             def clean(value):
                 if value is None:
@@ -668,8 +913,10 @@ class Environment:
 
             payload = {
                 "lobbyCode": self.lobby_code,
-                "startId": int(start_id),
-                "endId": int(end_id),
+                "startId": int(start.id),
+                "endId": int(end.id),
+                "startUid": start.uid,
+                "endUid": end.uid,
                 "read": clean(read),
                 "write": clean(write),
                 "move": clean(move),
@@ -681,17 +928,23 @@ class Environment:
             print(f"[SignalR] Sending connection proposal → {payload}")
             request_helper.propose_connection(payload)
 
+    def _propose_move(self, node):
+        if self.multiplayer and not self.is_host:
+            request_helper.propose_move(self.lobby_code, node.uid, node.pos)
+
     def _propose_delete(self, target):
         if self.multiplayer and not self.is_host:
             if hasattr(target, "start") and hasattr(target, "end"):
                 target_data = {
                     "type": "connection",
+                    "uid": target.uid,
                     "start": {"x": target.start.pos.x, "y": target.start.pos.y},
                     "end": {"x": target.end.pos.x, "y": target.end.pos.y},
                 }
             elif hasattr(target, "pos"):
                 target_data = {
                     "type": "node",
+                    "uid": target.uid,
                     "x": target.pos.x,
                     "y": target.pos.y,
                 }
@@ -709,21 +962,93 @@ class Environment:
         }
 
     def apply_remote_state(self, state):
-        if not self.is_host:
-            Node._id_counter = 0
-            self.nodes.clear()
-            self.connections.clear()
+        if self.is_host:
+            return
+
+        seq = state.get("seq")
+        if "ops" not in state:
+            self._apply_snapshot(state.get("snapshot", state))
+            self.sync_seq = seq or 0
+            self.resync_requested_at = None
+            return
+
+        if self.resync_requested_at is not None:
+            if time.monotonic() - self.resync_requested_at > RESYNC_RETRY:
+                self._request_resync()
+            return
+        if seq is None or seq <= self.sync_seq:
+            return
+        if seq != self.sync_seq + 1:
+            print(f"[Multiplayer] Sync gap ({self.sync_seq} -> {seq}), requesting snapshot")
+            self._request_resync()
+            return
+
+        applied = all([self._apply_op(op) for op in state["ops"]])
+        self.sync_seq = seq
+        self._sync_machine()
+        if not applied:
+            self._request_resync()
+
+    def _request_resync(self):
+        self.resync_requested_at = time.monotonic()
+        request_helper.request_state_resync(self.lobby_code)
 
-            for node_data in state.get("nodes", []):
-                node = Node.from_dict(node_data)
-                self.nodes.append(node)
+    def _apply_snapshot(self, snapshot):
+        Node._id_counter = 0
+        self.nodes.clear()
+        self.connections.clear()
 
-            for conn_data in state.get("connections", []):
-                conn = Connection.from_dict(conn_data, self.nodes)
+        for node_data in snapshot.get("nodes", []):
+            node = Node.from_dict(node_data)
+            self.nodes.append(node)
+
+        for conn_data in snapshot.get("connections", []):
+            conn = Connection.from_dict(conn_data, self.nodes)
+            if conn is not None:
                 self.connections.append(conn)
 
-            self._sync_machine()
-        print(state)
+        self._sync_machine()
+
+    def _find_by_uid(self, items, uid):
+        return next((item for item in items if item.uid == uid), None)
+
+    def _apply_op(self, op):
+        kind = op.get("op")
+        if kind == "add_node":
+            node = Node.from_dict(op["node"])
+            self.nodes.append(node)
+            return True
+
+        if kind == "move_node":
+            node = self._find_by_uid(self.nodes, op.get("uid"))
+            if node is None:
+                return False
+            node.pos = pygame.Vector2(op["x"], op["y"])
+            return True
+
+        if kind == "delete_node":
+            node = self._find_by_uid(self.nodes, op.get("uid"))
+            if node is None:
+                return False
+            self._delete_node(node)
+            return True
+
+        if kind == "add_connection":
+            conn = Connection.from_dict(op["connection"], self.nodes)
+            if conn is None:
+                return False
+            self.connections.append(conn)
+            return True
+
+        if kind == "delete_connection":
+            conn = self._find_by_uid(self.connections, op.get("uid"))
+            if conn is None:
+                return False
+            self.connections.remove(conn)
+            return True
+
+        print(f"[Multiplayer] Unknown sync op {kind}")
+        return False
 
     def create_node_from_proposal(self, x, y, is_end):
         pos = pygame.Vector2(x, y)
@@ -742,14 +1067,19 @@ class Environment:
 
         self.nodes.append(new_node)
         self._sync_machine()
+        self._record_op({"op": "add_node", "node": new_node.to_dict()})
         self._broadcast_state()
         print(f"[Host] Added proposed node at ({snapped_pos.x}, {snapped_pos.y}) and broadcasted")
 
     def create_connection_from_proposal(self, data):
         start_id = data.get("startId")
         end_id = data.get("endId")
-        start = next((n for n in self.nodes if n.id == start_id), None)
-        end = next((n for n in self.nodes if n.id == end_id), None)
+        if data.get("startUid") and data.get("endUid"):
+            start = self._find_by_uid(self.nodes, data["startUid"])
+            end = self._find_by_uid(self.nodes, data["endUid"])
+        else:
+            start = next((n for n in self.nodes if n.id == start_id), None)
+            end = next((n for n in self.nodes if n.id == end_id), None)
         if not start or not end:
             print(f"[Host] Invalid connection proposal ({start_id}->{end_id})")
             return
@@ -789,32 +1119,56 @@ class Environment:
 
         self.connections.append(conn)
         self._sync_machine()
+        self._record_op({"op": "add_connection", "connection": conn.to_dict()})
         self._broadcast_state()
         print(f"[Host] Added connection {start.id}->{end.id} and broadcasted")
 
     def apply_delete_proposal(self, target_data):
         print("[Host] Applying delete proposal:", target_data)
         target_type = target_data.get("type")
+        uid = target_data.get("uid")
         if target_type == "node":
-            x = target_data.get("x")
-            y = target_data.get("y")
-            if x is None or y is None:
-                return
-            pos = pygame.Vector2(x, y)
-            node = self._get_node_at(pos, world_space=True)
+            node = self._find_by_uid(self.nodes, uid) if uid else None
+            if node is None:
+                x = target_data.get("x")
+                y = target_data.get("y")
+                if x is None or y is None:
+                    return
+                node = self._get_node_at(pygame.Vector2(x, y), world_space=True)
             if node:
+                self._record_op({"op": "delete_node", "uid": node.uid})
                 self._delete_node(node)
-                print(f"[Host] Deleted node near ({x}, {y})")
+                print(f"[Host] Deleted node {node.uid}")
 
         elif target_type == "connection":
-            start_pos = pygame.Vector2(target_data["start"]["x"], target_data["start"]["y"])
-            end_pos = pygame.Vector2(target_data["end"]["x"], target_data["end"]["y"])
-            for conn in list(self.connections):
-                if (conn.start.pos - start_pos).length() < 1e-3 and (conn.end.pos - end_pos).length() < 1e-3:
-                    self.connections.remove(conn)
-                    print(f"[Host] Deleted connection between ({start_pos}) and ({end_pos})")
-                    break
+            conn = self._find_by_uid(self.connections, uid) if uid else None
+            if conn is None:
+                start_pos = pygame.Vector2(target_data["start"]["x"], target_data["start"]["y"])
+                end_pos = pygame.Vector2(target_data["end"]["x"], target_data["end"]["y"])
+                conn = next((c for c in self.edge_index.query_point(start_pos.x, start_pos.y, 1)
+                             if (c.start.pos - start_pos).length() < 1e-3 and (c.end.pos - end_pos).length() < 1e-3), None)
+            if conn:
+                self._record_op({"op": "delete_connection", "uid": conn.uid})
+                self.connections.remove(conn)
+                print(f"[Host] Deleted connection {conn.uid}")
 
         self._sync_machine()
         self._broadcast_state()
         print("[Host] Applied delete proposal and broadcasted")
+
+    def apply_move_proposal(self, data):
+        if not self.is_host:
+            return
+        node = self._find_by_uid(self.nodes, data.get("uid"))
+        x = data.get("x")
+        y = data.get("y")
+        if node is None or x is None or y is None:
+            print("[Host] Ignored move proposal for unknown node, resending snapshot")
+            self.send_snapshot()
+            return
+        node.pos = pygame.Vector2(x, y)
+        self._index_node(node)
+        self.graph_version += 1
+        self._record_op({"op": "move_node", "uid": node.uid, "x": node.pos.x, "y": node.pos.y})
+        self._broadcast_state()
+        print(f"[Host] Moved node {node.uid} and broadcasted")
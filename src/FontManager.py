@@ -1,11 +1,52 @@
+from collections import OrderedDict
+
 import pygame
 
 class FontManager:
     _cache = {}
+    _text_cache = OrderedDict()
+    _atlases = OrderedDict()
+    TEXT_CACHE_SIZE = 512
+    ATLAS_CACHE_SIZE = 32
 
     @staticmethod
     def get(size: int, bold=True, name="futura"):
         key = (name, size, bold)
         if key not in FontManager._cache:
             FontManager._cache[key] = pygame.font.SysFont(name, size, bold)
-        return FontManager._cache[key]
\ No newline at end of file
+        return FontManager._cache[key]
+
+    @staticmethod
+    def quantize(size, step=2):
+        return max(step, int(round(size / step)) * step)
+
+    @staticmethod
+    def render(text, size: int, color, bold=True, name="futura"):
+        key = (name, size, bold, text, tuple(color))
+        cache = FontManager._text_cache
+        surface = cache.get(key)
+        if surface is not None:
+            cache.move_to_end(key)
+            return surface
+
+        surface = FontManager.get(size, bold, name).render(text, True, color)
+        cache[key] = surface
+        if len(cache) > FontManager.TEXT_CACHE_SIZE:
+            cache.popitem(last=False)
+        return surface
+
+    @staticmethod
+    def glyph_atlas(alphabet, size: int, color, bold=False, name="futura"):
+        key = (name, size, bold, tuple(color), tuple(alphabet))
+        atlases = FontManager._atlases
+        atlas = atlases.get(key)
+        if atlas is not None:
+            atlases.move_to_end(key)
+            return atlas
+
+        font = FontManager.get(size, bold, name)
+        atlas = {symbol: font.render(symbol, True, color) for symbol in alphabet}
+        atlases[key] = atlas
+        if len(atlases) > FontManager.ATLAS_CACHE_SIZE:
+            atlases.popitem(last=False)
+        return atlas
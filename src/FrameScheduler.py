@@ -0,0 +1,34 @@
+import pygame
+
+
+class FrameScheduler:
+    def __init__(self, clock, active_fps=60, idle_fps=8, idle_delay=1.5, poll_ms=5):
+        self.clock = clock
+        self.active_fps = active_fps
+        self.idle_fps = idle_fps
+        self.idle_delay = idle_delay
+        self.poll_ms = poll_ms
+        self.idle_time = 0.0
+
+    def wake(self):
+        self.idle_time = 0.0
+
+    def is_idle(self):
+        return self.idle_time >= self.idle_delay
+
+    def tick(self, busy=False):
+        if busy or any(pygame.key.get_pressed()) or any(pygame.mouse.get_pressed()):
+            self.wake()
+
+        if not self.is_idle():
+            dt = self.clock.tick(self.active_fps) / 1000
+        else:
+            deadline = pygame.time.get_ticks() + int(1000 / self.idle_fps)
+            while not pygame.event.peek() and pygame.time.get_ticks() < deadline:
+                pygame.time.wait(self.poll_ms)
+            if pygame.event.peek():
+                self.wake()
+            dt = self.clock.tick() / 1000
+
+        self.idle_time += dt
+        return dt
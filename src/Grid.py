@@ -46,11 +46,12 @@ class Grid:
         self.offset = pygame.Vector2(0, 0)
         self.zoom = 1.0
 
-    def draw(self):
+    def draw(self, surface=None):
         if not self.enabled:
             return
 
-        w, h = self.screen.get_size()
+        surface = surface or self.screen
+        w, h = surface.get_size()
         z = self.zoom
         center = pygame.Vector2(w / 2, h / 2)
 
@@ -64,19 +65,31 @@ class Grid:
         for k in range(kx_start, kx_end + 1):
             xw = k * self.base_spacing
             xs = (xw - self.offset.x) * z + center.x
-            pygame.draw.line(self.screen, self.color, (xs, 0), (xs, h), 1)
+            pygame.draw.line(surface, self.color, (xs, 0), (xs, h), 1)
 
         ky_start = math.floor(world_top / self.base_spacing)
         ky_end = math.floor(world_bottom / self.base_spacing) + 1
         for k in range(ky_start, ky_end + 1):
             yw = k * self.base_spacing
             ys = (yw - self.offset.y) * z + center.y
-            pygame.draw.line(self.screen, self.color, (0, ys), (w, ys), 1)
+            pygame.draw.line(surface, self.color, (0, ys), (w, ys), 1)
+
+    def visible_world_rect(self, margin=0):
+        w, h = self.screen.get_size()
+        half_w = w / 2 / self.zoom + margin
+        half_h = h / 2 / self.zoom + margin
+        return self.offset.x - half_w, self.offset.y - half_h, self.offset.x + half_w, self.offset.y + half_h
 
     def world_to_screen(self, pos):
         center = pygame.Vector2(self.screen.get_width() / 2, self.screen.get_height() / 2)
         return (pos - self.offset) * self.zoom + center
 
+    def world_to_screen_points(self, points):
+        z = self.zoom
+        ox = self.screen.get_width() / 2 - self.offset.x * z
+        oy = self.screen.get_height() / 2 - self.offset.y * z
+        return [(x * z + ox, y * z + oy) for x, y in points]
+
     def screen_to_world(self, pos):
         center = pygame.Vector2(self.screen.get_width() / 2, self.screen.get_height() / 2)
         return (pygame.Vector2(pos) - center) / self.zoom + self.offset
@@ -15,7 +15,9 @@ class LeaderboardMenu:
         self.entry_font = FontManager.get(24)
         self.header_font = FontManager.get(22)
 
-        self.entries = request_helper.get_leaderboard(level_name) or []
+        self.entries = []
+        self.loading = True
+        request_helper.run_async(request_helper.get_leaderboard, level_name, on_done=self._on_entries_loaded)
 
         self.close_button = Button(
             "Close",
@@ -24,6 +26,10 @@ class LeaderboardMenu:
             self._close
         )
 
+    def _on_entries_loaded(self, entries):
+        self.entries = entries or []
+        self.loading = False
+
     def _close(self):
         if self.on_close:
             self.on_close()
@@ -123,7 +129,8 @@ class LeaderboardMenu:
         max_rows = int((panel_rect.height - 70) // row_height)
 
         if not self.entries:
-            empty = self.entry_font.render("No submissions yet for this level.", True, COLORS["text"])
+            message = "Loading submissions..." if self.loading else "No submissions yet for this level."
+            empty = self.entry_font.render(message, True, COLORS["text"])
             empty_rect = empty.get_rect(center=panel_rect.center)
             screen.blit(empty, empty_rect)
         else:
@@ -1,7 +1,7 @@
 import json
 
 class Level:
-    def __init__(self, name, type, description, detailedDescription, alphabet, objective, mode, solution=None, transform_tests=None, correct_examples=None, wrong_examples=None, double_tape=False):
+    def __init__(self, name, type, description, detailedDescription, alphabet, objective, mode, solution=None, transform_tests=None, correct_examples=None, wrong_examples=None, double_tape=False, max_steps=None):
         self.name = name
         self.type = type
         self.description = description
@@ -14,6 +14,7 @@ class Level:
         self.correct_examples = correct_examples or []
         self.wrong_examples = wrong_examples or []
         self.double_tape = double_tape
+        self.max_steps = max_steps
 
     def to_dict(self):
         return {
@@ -28,7 +29,8 @@ class Level:
             "transform_tests": self.transform_tests,
             "correct_examples": self.correct_examples,
             "wrong_examples": self.wrong_examples,
-            "double_tape": self.double_tape
+            "double_tape": self.double_tape,
+            "max_steps": self.max_steps
         }
 
     @staticmethod
@@ -45,7 +47,8 @@ class Level:
             transform_tests=data["transform_tests"],
             correct_examples=data.get("correct_examples"),
             wrong_examples=data.get("wrong_examples"),
-            double_tape=data.get("double_tape", False)
+            double_tape=data.get("double_tape", False),
+            max_steps=data.get("max_steps")
         )
 
     def save_to_file(self, path):
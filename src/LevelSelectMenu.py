@@ -33,6 +33,7 @@ class LevelSelectMenu:
         self.type_buttons = []
         self.auth_popup = None
         self.current_user = None
+        self.verifying = False
         self.on_close = on_close
 
 
@@ -250,6 +251,10 @@ class LevelSelectMenu:
 
         self._draw_title_box("Select Level", w, h)
 
+        if self.verifying:
+            status = self.font_small.render("Verifying session...", True, COLORS["text"])
+            self.screen.blit(status, status.get_rect(center=(w / 2, h * 0.12)))
+
 
         left_rect = pygame.Rect(0, 0, w * 0.3, h)
         pygame.draw.rect(self.screen, (25, 30, 55), left_rect)
@@ -466,11 +471,23 @@ class LevelSelectMenu:
         self._build_level_buttons()
 
     def _open_workshop_menu(self):
+        if self.verifying:
+            return
         token, user = request_helper.load_session()
-        if token is not None and user is not None:
-            if request_helper.verify_authentication():
-                if request_helper.is_authenticated():
-                    self.current_user = user
+        if token is None or user is None:
+            self._on_workshop_verified(user, False)
+            return
+        self.verifying = True
+        request_helper.run_async(self._check_session,
+                                 on_done=lambda ok: self._on_workshop_verified(user, ok))
+
+    def _check_session(self):
+        return request_helper.verify_authentication() and request_helper.is_authenticated()
+
+    def _on_workshop_verified(self, user, ok):
+        self.verifying = False
+        if ok:
+            self.current_user = user
         if self.current_user is None:
             self.auth_popup = AuthenticationPopup(self.screen, self._on_authenticated)
             return
@@ -533,7 +550,14 @@ class LevelSelectMenu:
         self._open_leaderboard()
 
     def _open_leaderboard(self):
-        if request_helper.verify_authentication():
+        if self.verifying:
+            return
+        self.verifying = True
+        request_helper.run_async(request_helper.verify_authentication, on_done=self._on_leaderboard_verified)
+
+    def _on_leaderboard_verified(self, ok):
+        self.verifying = False
+        if ok:
             if not self.selected_level:
                 return
             self.leaderboard_menu = LeaderboardMenu(
@@ -1,4 +1,6 @@
 import threading
+import time
+from collections import deque
 
 import pygame
 from Button import Button, COLORS
@@ -7,6 +9,8 @@ import request_helper
 from datetime import datetime, timezone
 from Environment import Environment
 
+INBOUND_BUDGET = 0.004
+
 
 def time_since_utc(utc_str):
     if not utc_str:
@@ -75,20 +79,31 @@ class LobbyMenu:
         self.lobby_scroll = 0
         self.level_scroll = 0
         self.lobbies = []
+        self.lobby_table = {}
+        self.join_button_cache = {}
         self.kick_buttons = []
+        self.loading_lobbies = 0
+        self.loading_levels = False
+
+        self.inbound = deque()
+        self.inbound_lock = threading.Lock()
+        self.inbound_collapsed = 0
 
         request_helper.connect_signalr(
-            on_lobby_created=self._on_lobby_created,
-            on_player_joined=self._on_player_joined,
-            on_player_left=self._on_player_left,
-            on_lobby_deleted=self._on_lobby_deleted,
-            on_player_kicked=self._on_player_kicked,
-            on_lobby_started=self.on_lobby_started,
-            on_environment_synced=self.on_environment_synced,
-            on_node_proposed=self.on_node_proposed,
-            on_connection_proposed=self.on_connection_proposed,
-            on_delete_proposed=self.on_delete_proposed,
-            on_chat_message_received=self.on_chat_message_received
+            on_lobby_created=self._queued(self._on_lobby_created),
+            on_player_joined=self._queued(self._on_player_joined),
+            on_player_left=self._queued(self._on_player_left),
+            on_lobby_deleted=self._queued(self._on_lobby_deleted),
+            on_player_kicked=self._queued(self._on_player_kicked),
+            on_lobby_started=self._queued(self.on_lobby_started),
+            on_environment_synced=self._queue_environment_state,
+            on_node_proposed=self._queued(self.on_node_proposed),
+            on_connection_proposed=self._queued(self.on_connection_proposed),
+            on_delete_proposed=self._queued(self.on_delete_proposed),
+            on_chat_message_received=self._queued(self.on_chat_message_received),
+            on_reconnected=self._queued(self._on_hub_reconnected),
+            on_move_proposed=self._queued(self.on_move_proposed),
+            on_resync_requested=self._queued(self.on_resync_requested)
         )
         self.join_buttons = []
         self.current_lobby = None
@@ -144,16 +159,127 @@ class LobbyMenu:
         self.chat_timer = 0
         self.max_chat_messages = 50
 
-    def refresh_lobbies(self):
-        all_lobbies = request_helper.get_lobbies(include_started=True) or []
+    def _queued(self, handler):
+        def enqueue(data=None):
+            with self.inbound_lock:
+                self.inbound.append((handler, data))
+            request_helper.trigger_event()
+        return enqueue
+
+    def _queue_environment_state(self, data):
+        state = data.get("state") if isinstance(data, dict) else None
+        with self.inbound_lock:
+            if isinstance(state, dict) and "ops" not in state:
+                kept = [item for item in self.inbound if item[0] != self.on_environment_synced]
+                self.inbound_collapsed += len(self.inbound) - len(kept)
+                self.inbound.clear()
+                self.inbound.extend(kept)
+            self.inbound.append((self.on_environment_synced, data))
+        request_helper.trigger_event()
 
-        if self.hide_started:
-            self.lobbies = [l for l in all_lobbies if not l.get("hasStarted", False)]
-        else:
-            self.lobbies = all_lobbies
+    def process_inbound(self, budget=INBOUND_BUDGET):
+        deadline = time.perf_counter() + budget
+        while self.inbound:
+            with self.inbound_lock:
+                if not self.inbound:
+                    break
+                handler, data = self.inbound.popleft()
+            try:
+                handler(data)
+            except Exception as e:
+                print(f"[SignalR] Failed to handle {getattr(handler, '__name__', handler)}: {e}")
+            if time.perf_counter() >= deadline:
+                break
+        if self.inbound:
+            request_helper.trigger_event()
+
+    def refresh_lobbies(self, on_done=None):
+        self.loading_lobbies += 1
+        request_helper.run_async(request_helper.get_lobbies, include_started=True,
+                                 on_done=lambda lobbies: self._on_lobbies_loaded(lobbies, on_done))
+
+    def _on_lobbies_loaded(self, all_lobbies, on_done=None):
+        self.loading_lobbies -= 1
+        if all_lobbies is not None:
+            self.lobby_table = {l.get("code"): l for l in all_lobbies if l.get("code")}
+
+        self._update_lobby_view()
+        if on_done:
+            on_done()
 
+    def _update_lobby_view(self):
+        lobbies = list(self.lobby_table.values())
+        if self.hide_started:
+            lobbies = [l for l in lobbies if not l.get("hasStarted", False)]
+        if self.code_search:
+            lobbies = [l for l in lobbies if str(l.get("code", "")).startswith(self.code_search)]
+        self.lobbies = lobbies
         self._build_join_buttons()
 
+    def _lobby_from_payload(self, data):
+        lobby = data.get("lobby")
+        if isinstance(lobby, dict) and lobby.get("code"):
+            return lobby
+        if data.get("code") and "hostPlayer" in data and "lobbyPlayers" in data:
+            return data
+        return None
+
+    def _apply_lobby_event(self, data, mutate=None, after=None):
+        code = data.get("lobbyCode") or data.get("code")
+        full = self._lobby_from_payload(data)
+        current = self.lobby_table.get(code)
+
+        version = (full or data).get("version")
+        if version is not None and current is not None and current.get("version") is not None:
+            if version <= current["version"]:
+                return
+            if version != current["version"] + 1:
+                self.refresh_lobbies(on_done=after)
+                return
+
+        if full is not None:
+            self.lobby_table[full["code"]] = full
+        elif current is None or mutate is None or not mutate(current):
+            self.refresh_lobbies(on_done=after)
+            return
+        elif version is not None:
+            current["version"] = version
+
+        self._update_lobby_view()
+        if after:
+            after()
+
+    def _player_name(self, data):
+        return data.get("playerName") or data.get("player") or data.get("username")
+
+    def _add_player(self, name):
+        def mutate(lobby):
+            if not name:
+                return False
+            players = lobby.setdefault("lobbyPlayers", [])
+            if name not in players:
+                players.append(name)
+            return True
+        return mutate
+
+    def _remove_player(self, name):
+        def mutate(lobby):
+            if not name:
+                return False
+            players = lobby.get("lobbyPlayers", [])
+            if name in players:
+                players.remove(name)
+            return True
+        return mutate
+
+    def _mark_started(self, lobby):
+        lobby["hasStarted"] = True
+        return True
+
+    def _on_hub_reconnected(self, data=None):
+        print("[SignalR] Reconnected, refreshing lobby list")
+        self.refresh_lobbies(on_done=lambda: self._update_current_lobby(self.current_lobby.get("code")) if self.current_lobby else None)
+
     def build_toggle_started_button(self):
         self.btn_toggle_started = Button("Hide Started Lobbies", (0.68, 0.14, 0.1, 0.05),
                                          self.font_small, self._toggle_hide_started)
@@ -164,15 +290,19 @@ class LobbyMenu:
         self.btn_toggle_started.text = (
             "Show All Lobbies" if self.hide_started else "Hide Started Lobbies"
         )
-        self.refresh_lobbies()
+        self._update_lobby_view()
 
     def _build_join_buttons(self):
-        self.join_buttons.clear()
-        for i, lobby in enumerate(self.lobbies):
+        buttons = {}
+        for lobby in self.lobbies:
             code = lobby.get("code", "???")
-            btn = Button("Join", (0.0, 0.0, 0.2, 0.05),
-                         self.font_small, lambda c=code: self._join_lobby(c))
-            self.join_buttons.append(btn)
+            btn = self.join_button_cache.get(code)
+            if btn is None:
+                btn = Button("Join", (0.0, 0.0, 0.2, 0.05),
+                             self.font_small, lambda c=code: self._join_lobby(c))
+            buttons[code] = btn
+        self.join_button_cache = buttons
+        self.join_buttons = [buttons[lobby.get("code", "???")] for lobby in self.lobbies]
 
     def _build_kick_buttons(self):
         self.kick_buttons.clear()
@@ -368,7 +498,8 @@ class LobbyMenu:
         self.btn_toggle_started.font = FontManager.get(int(20 * (h / 1080)))
         self.btn_toggle_started.draw(self.screen)
         if len(self.lobbies) == 0:
-            no_lobbies_text = self.font_medium.render("No lobbies available.", True, COLORS["text"])
+            message = "Loading lobbies..." if self.loading_lobbies else "No lobbies available."
+            no_lobbies_text = self.font_medium.render(message, True, COLORS["text"])
             self.screen.blit(no_lobbies_text, no_lobbies_text.get_rect(center=panel_rect.center))
 
     def _draw_lobby_view(self, w, h):
@@ -609,6 +740,10 @@ class LobbyMenu:
         start = self.level_scroll
         end = min(start + max_visible, len(self.level_results))
 
+        if self.loading_levels:
+            loading = self.font_small.render("Loading levels...", True, COLORS["text"])
+            self.screen.blit(loading, loading.get_rect(center=box.center))
+
         for i, lvl in enumerate(self.level_results[start:end], start=start):
             rect = pygame.Rect(box.x + 20, y_start + (i - start) * (item_height + 10),
                                box.width - 40, item_height)
@@ -638,8 +773,10 @@ class LobbyMenu:
             return
 
         code = self.current_lobby.get("code")
-        success = request_helper.kick_player(code, player_name)
+        request_helper.run_async(request_helper.kick_player, code, player_name,
+                                 on_done=lambda success: self._on_player_kick_done(player_name, success))
 
+    def _on_player_kick_done(self, player_name, success):
         if success:
             self._show_message(f"{player_name} was kicked.")
             self.refresh_lobbies()
@@ -660,22 +797,10 @@ class LobbyMenu:
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_RETURN:
                     target_lobby = next((l for l in self.lobbies if l.get("code") == self.password_target_code), None)
-                    if target_lobby["hasStarted"]:
-                        if request_helper.join_lobby(self.password_target_code, self.password_input):
-                            self.current_lobby = target_lobby
-                            request_helper.join_signalr_group(self.password_target_code)
-                            self.enter_multiplayer_environment()
-                    else:
-                        if request_helper.join_lobby(self.password_target_code, self.password_input):
-                            request_helper.join_signalr_group(self.password_target_code)
-                            self.refresh_lobbies()
-                            updated = next((l for l in self.lobbies if l.get("code") == self.password_target_code), None)
-                            self.current_lobby = updated
-                            self.btn_leave = Button("Leave Lobby", (0.15, 0.85, 0.25, 0.07),
-                                                    self.font_medium, self._leave_lobby)
-                            self._build_kick_buttons()
-                        else:
-                            self._show_message("Incorrect password or failed join.")
+                    if target_lobby:
+                        self._show_message("Joining lobby...")
+                        request_helper.run_async(request_helper.join_lobby, self.password_target_code, self.password_input,
+                                                 on_done=lambda ok, lobby=target_lobby: self._on_lobby_joined(lobby, ok))
                     self.show_password_popup = False
                 elif event.key == pygame.K_ESCAPE:
                     self.show_password_popup = False
@@ -824,77 +949,74 @@ class LobbyMenu:
         self.btn_toggle_started.handle_event(event)
 
     def _on_lobby_created(self, data):
-        self.refresh_lobbies()
-        request_helper.trigger_event()
+        self._apply_lobby_event(data)
 
     def _on_player_joined(self, data):
         self._show_message("A player has joined the lobby.")
         print("Player joined the lobby")
+        code = data.get("lobbyCode")
         if self.in_environment:
             if self.environment and self.environment.is_host:
-                threading.Timer(1.0, self.environment._broadcast_state).start()
+                self.environment.schedule_snapshot(1.0)
+            self._apply_lobby_event(data, self._add_player(self._player_name(data)))
         else:
-            self.refresh_lobbies()
+            self._apply_lobby_event(data, self._add_player(self._player_name(data)),
+                                    after=lambda: self._update_current_lobby(code))
 
-            code = data.get("lobbyCode")
-            if self.current_lobby and self.current_lobby.get("code") == code:
-                updated = next((l for l in self.lobbies if l.get("code") == code), None)
-                if updated:
-                    self.current_lobby = updated
-                    self._build_kick_buttons()
-            request_helper.trigger_event()
+    def _update_current_lobby(self, code):
+        if self.current_lobby and self.current_lobby.get("code") == code:
+            updated = self.lobby_table.get(code)
+            if updated:
+                self.current_lobby = updated
+                self._build_kick_buttons()
+            return updated
 
     def _on_player_left(self, data):
         self._show_message("A player has left the lobby.")
         print("Player left the lobby")
-        self.refresh_lobbies()
-        if not any(l.get("code") == self.current_lobby.get("code") for l in self.lobbies):
+        code = data.get("lobbyCode")
+        self._apply_lobby_event(data, self._remove_player(self._player_name(data)),
+                                after=lambda: self._on_player_left_refreshed(code))
+
+    def _on_player_left_refreshed(self, code):
+        if not self.current_lobby:
+            return
+        if self.current_lobby.get("code") not in self.lobby_table:
             if self.in_environment:
                 self.environment.multiplayer_left = True
             self.current_lobby = None
-            request_helper.leave_signalr_group(data.get("lobbyCode"))
-            request_helper.trigger_event()
+            request_helper.leave_signalr_group(code)
             return
-        request_helper.trigger_event()
-
-        code = data.get("lobbyCode")
-        if self.current_lobby and self.current_lobby.get("code") == code:
-            updated = next((l for l in self.lobbies if l.get("code") == code), None)
-            if updated:
-                self.current_lobby = updated
-                self._build_kick_buttons()
-        request_helper.trigger_event()
+        self._update_current_lobby(code)
 
 
     def _on_player_kicked(self, data):
-        if not self.current_lobby:
-            return
-
         code = data.get("lobbyCode")
         kicked_name = data.get("kickedPlayerName")
+        mutate = self._remove_player(kicked_name)
+
+        if not self.current_lobby or self.current_lobby.get("code") != code:
+            self._apply_lobby_event(data, mutate)
+            return
 
         if request_helper.get_username() == kicked_name:
-            if self.current_lobby.get("code") == code:
-                if self.in_environment:
-                    pass
-                else:
-                    self._show_message("You were kicked from the lobby.")
-                    request_helper.leave_signalr_group(code)
-                    self.current_lobby = None
+            if not self.in_environment:
+                self._show_message("You were kicked from the lobby.")
+                request_helper.leave_signalr_group(code)
+                self.current_lobby = None
+            self._apply_lobby_event(data, mutate)
             return
 
         if self.in_environment:
             self._show_message(f"{kicked_name} was kicked from the lobby.")
+            self._apply_lobby_event(data, mutate)
         else:
-            if self.current_lobby.get("code") == code:
-                self.refresh_lobbies()
-                updated = next((l for l in self.lobbies if l.get("code") == code), None)
-                if updated:
-                    self.current_lobby = updated
-                    self._build_kick_buttons()
-                    if request_helper.get_username() != updated.get("hostPlayer"):
-                        self._show_message(f"{kicked_name} was kicked from the lobby.")
-            request_helper.trigger_event()
+            self._apply_lobby_event(data, mutate, after=lambda: self._on_player_kicked_refreshed(code, kicked_name))
+
+    def _on_player_kicked_refreshed(self, code, kicked_name):
+        updated = self._update_current_lobby(code)
+        if updated and request_helper.get_username() != updated.get("hostPlayer"):
+            self._show_message(f"{kicked_name} was kicked from the lobby.")
 
     def _on_lobby_deleted(self, data):
         print("Lobby was closed by host")
@@ -904,7 +1026,8 @@ class LobbyMenu:
             if self.in_environment:
                 self.environment.multiplayer_left = True
             self.current_lobby = None
-        self.refresh_lobbies()
+        self.lobby_table.pop(code, None)
+        self._update_lobby_view()
 
     def _cancel_level_popup(self):
         self.show_level_popup = False
@@ -927,32 +1050,48 @@ class LobbyMenu:
             self.password_timer = pygame.time.get_ticks()
             return
 
-        if request_helper.join_lobby(code):
-            if lobby.get("hasStarted", False):
-                self.current_lobby = lobby
-                request_helper.join_signalr_group(code)
-                self.enter_multiplayer_environment()
-                return
-            self._show_message("Joined the lobby successfully!")
-            self.btn_leave = Button("Leave Lobby", (0.15, 0.85, 0.25, 0.07),
-                                    self.font_medium, self._leave_lobby)
-            self.refresh_lobbies()
-            request_helper.join_signalr_group(code)
-            lobby = next((l for l in self.lobbies if l.get("code") == code), None)
+        self._show_message("Joining lobby...")
+        request_helper.run_async(request_helper.join_lobby, code,
+                                 on_done=lambda ok: self._on_lobby_joined(lobby, ok))
+
+    def _on_lobby_joined(self, lobby, ok):
+        code = lobby.get("code")
+        if not ok:
+            if lobby.get("passwordProtected", False):
+                self._show_message("Incorrect password or failed join.")
+            else:
+                self._show_message("Failed to join the lobby.")
+            return
+
+        if lobby.get("hasStarted", False):
             self.current_lobby = lobby
+            request_helper.join_signalr_group(code)
+            self.enter_multiplayer_environment()
+            return
+        self._show_message("Joined the lobby successfully!")
+        self.btn_leave = Button("Leave Lobby", (0.15, 0.85, 0.25, 0.07),
+                                self.font_medium, self._leave_lobby)
+        request_helper.join_signalr_group(code)
+
+        def joined():
+            self.current_lobby = self.lobby_table.get(code)
             self._build_kick_buttons()
-        request_helper.trigger_event()
+
+        self.refresh_lobbies(on_done=joined)
 
     def _leave_lobby(self):
         if not self.current_lobby:
             return
         code = self.current_lobby.get("code")
-        if request_helper.leave_lobby(code):
+        request_helper.run_async(request_helper.leave_lobby, code,
+                                 on_done=lambda ok: self._on_lobby_left(code, ok))
+
+    def _on_lobby_left(self, code, ok):
+        if ok:
             self._show_message("Left the lobby successfully!")
             self.current_lobby = None
             request_helper.leave_signalr_group(code)
             self.refresh_lobbies()
-        request_helper.trigger_event()
 
     def _host(self):
         if not self.selected_level:
@@ -961,13 +1100,17 @@ class LobbyMenu:
 
         password = self.host_password if self.require_password else None
 
-        lobby_data = request_helper.create_lobby(
+        self._show_message("Creating lobby...")
+        request_helper.run_async(
+            request_helper.create_lobby,
             self.selected_level["id"],
             self.lobby_name.strip() or "Unnamed Lobby",
             self.max_players,
-            password
+            password,
+            on_done=self._on_lobby_hosted
         )
 
+    def _on_lobby_hosted(self, lobby_data):
         if lobby_data:
             self.refresh_lobbies()
             self.current_lobby = lobby_data
@@ -987,16 +1130,17 @@ class LobbyMenu:
             self._show_message("At least 2 players are required to start the lobby.")
             return
         code = self.current_lobby.get("code")
-        success = request_helper.start_lobby(code)
+        request_helper.run_async(request_helper.start_lobby, code, on_done=self._on_lobby_start_done)
 
+    def _on_lobby_start_done(self, success):
         if success:
             self._show_message("Lobby started successfully!")
         else:
             self._show_message("Failed to start lobby.")
-        request_helper.trigger_event()
 
     def on_lobby_started(self, data):
         code = data.get("lobbyCode")
+        self._apply_lobby_event(data, self._mark_started)
 
         if self.current_lobby and self.current_lobby.get("code") == code:
             self.current_lobby["hasStarted"] = True
@@ -1017,14 +1161,28 @@ class LobbyMenu:
 
         if is_host:
             level_id = self.selected_level_id
-            level = None
-            if level_id:
-                level = request_helper.workshopitem_to_object(request_helper.get_workshop_item_by_id(level_id))
+            request_helper.run_async(self._fetch_host_level, level_id,
+                                     on_done=lambda level: self._open_environment(code, level, is_host))
         else:
             level_name = self.current_lobby.get("levelName", "")
-            level = next((request_helper.workshopitem_to_object(item)
-                          for item in request_helper.get_workshop_items().get("LevelItems", [])
-                          if item.get("name") == level_name), None)
+            request_helper.run_async(self._fetch_lobby_level, level_name,
+                                     on_done=lambda level: self._open_environment(code, level, is_host))
+        self._show_message("Loading level...")
+
+    def _fetch_host_level(self, level_id):
+        if not level_id:
+            return None
+        return request_helper.workshopitem_to_object(request_helper.get_workshop_item_by_id(level_id))
+
+    def _fetch_lobby_level(self, level_name):
+        items = request_helper.get_workshop_items() or {}
+        return next((request_helper.workshopitem_to_object(item)
+                     for item in items.get("LevelItems", [])
+                     if item.get("name") == level_name), None)
+
+    def _open_environment(self, code, level, is_host):
+        if not self.current_lobby or self.current_lobby.get("code") != code or self.in_environment:
+            return
 
         self.environment = Environment(
             self.screen,
@@ -1040,7 +1198,13 @@ class LobbyMenu:
 
 
     def _load_levels(self):
-        self.results = request_helper.get_workshop_items() or []
+        self.loading_levels = True
+        self.level_results = []
+        request_helper.run_async(request_helper.get_workshop_items, on_done=self._on_levels_loaded)
+
+    def _on_levels_loaded(self, results):
+        self.loading_levels = False
+        self.results = results or {}
         non_filtered_levels = self.results.get("LevelItems", [])
         self.level_results = []
         for level in non_filtered_levels:
@@ -1057,21 +1221,11 @@ class LobbyMenu:
         self.on_close()
 
     def _search_lobby_by_code(self, code):
-        all_lobbies = request_helper.get_lobbies() or []
-        filtered = [
-            l for l in all_lobbies
-            if str(l.get("code", "")).startswith(code)
-        ]
-
-        if filtered:
-            self.lobbies = filtered
-            self._build_join_buttons()
-            self._show_message(f"Found {len(filtered)} lobby(ies) matching '{code}'.")
+        self._update_lobby_view()
+        if self.lobbies:
+            self._show_message(f"Found {len(self.lobbies)} lobby(ies) matching '{code}'.")
         else:
-            self.lobbies = []
-            self._build_join_buttons()
             self._show_message("No lobbies found.")
-        request_helper.trigger_event()
 
     def on_environment_synced(self, data):
         print(f"[SignalR] Environment synced: {data.keys() if isinstance(data, dict) else data}")
@@ -1126,6 +1280,25 @@ class LobbyMenu:
         self.environment.apply_delete_proposal(target)
         request_helper.trigger_event()
 
+    def on_move_proposed(self, data):
+        code = data.get("lobbyCode")
+        if not self.environment or self.current_lobby.get("code") != code:
+            return
+
+        proposer = data.get("proposer")
+        print(f"[Multiplayer] Move proposed by {proposer}")
+        self.environment.apply_move_proposal(data)
+        request_helper.trigger_event()
+
+    def on_resync_requested(self, data):
+        code = data.get("lobbyCode")
+        if not self.environment or self.current_lobby.get("code") != code:
+            return
+
+        print(f"[Multiplayer] Resync requested by {data.get('requester', '?')}")
+        self.environment.send_snapshot()
+        request_helper.trigger_event()
+
     def on_chat_message_received(self, data):
         print("received chat message")
         code = data.get("lobbyCode")
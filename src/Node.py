@@ -1,6 +1,7 @@
 import pygame
 from Button import COLORS
 from FontManager import FontManager
+from identifiers import new_uid
 
 
 class Node:
@@ -9,6 +10,7 @@ class Node:
     def __init__(self, pos, is_end=False, is_start=False):
         self.id = Node._id_counter
         Node._id_counter += 1
+        self.uid = new_uid()
 
         self.pos = pygame.Vector2(pos)
         self.radius = 35
@@ -29,32 +31,32 @@ class Node:
         self.text_color = COLORS["text"]
         self.font_size = 35
 
-    def draw(self, screen, grid=None):
+    def draw(self, screen, grid=None, plain=False):
         draw_pos = self.pos
         radius = self.radius * grid.zoom
-        size = int(self.font_size * grid.zoom) if grid else self.font_size
-        font = FontManager.get(size)
+        size = FontManager.quantize(self.font_size * grid.zoom) if grid else self.font_size
         if grid:
             draw_pos = grid.world_to_screen(self.pos)
 
-        if self.is_start and not self.is_active:
+        active = self.is_active and not plain
+        if self.is_start and not active:
             color = self.start_color
-        elif self.is_end and not self.is_active:
+        elif self.is_end and not active:
             color = self.end_color
-        elif self.is_active:
+        elif active:
             color = (255, 220, 70)
         else:
             color = self.base_color
 
-        if self.selected:
+        if self.selected and not plain:
             pygame.draw.circle(screen, self.hover_color, draw_pos, radius + 4)
-        elif self.hovered:
+        elif self.hovered and not plain:
             pygame.draw.circle(screen, self.hover_color, draw_pos, radius + 2)
 
         pygame.draw.circle(screen, color, draw_pos, radius)
         pygame.draw.circle(screen, self.text_color, draw_pos, radius, 2)
 
-        text = font.render(f"q{self.id}", True, self.text_color)
+        text = FontManager.render(f"q{self.id}", size, self.text_color)
         text_rect = text.get_rect(center=draw_pos)
         screen.blit(text, text_rect)
 
@@ -104,11 +106,13 @@ class Node:
             is_start=node_data.get("is_start", False)
         )
         node.id = node_data["id"]
+        node.uid = node_data.get("uid") or node.uid
         return node
 
     def to_dict(self):
         return {
             "id": self.id,
+            "uid": self.uid,
             "x": self.pos.x,
             "y": self.pos.y,
             "is_end": self.is_end,
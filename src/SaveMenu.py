@@ -1,9 +1,13 @@
+from collections import OrderedDict
+
 import pygame
 from MainMenu import COLORS
 from Button import Button
 import save_manager
 from FontManager import FontManager
 
+THUMBNAIL_CACHE_SIZE = 48
+
 class SaveMenu:
     def __init__(self, screen, turing_machine, on_close, on_load, upload_mode=False, on_upload=None):
         self.screen = screen
@@ -22,6 +26,7 @@ class SaveMenu:
         self.saves = []
         self.input_active = False
         self.input_text = ""
+        self.thumbnails = OrderedDict()
 
         self.close_button = Button("Back", (0.05, 0.1, 0.1, 0.07), self.small, self.close)
         self.new_button = Button("+ New Save", (0.80, 0.1, 0.15, 0.07), self.small, self.new_save_prompt)
@@ -220,11 +225,12 @@ class SaveMenu:
             pygame.draw.rect(self.screen, COLORS["accent"], rect, 2, border_radius=12)
             name_label = self.small.render(save["name"], True, COLORS["text"])
             self.screen.blit(name_label, (rect.x + 10, rect.y + 8))
-            try:
-                data = save_manager.load_machine(save["name"], workshop =(self.active_tab == "Workshop Machines"))
-                self._draw_preview(data, rect)
-            except Exception as e:
-                print("Error drawing preview:", e)
+            count_label = self.small.render(f"{save.get('nodes', 0)} nodes, {save.get('connections', 0)} connections", True, COLORS["accent"])
+            self.screen.blit(count_label, (rect.x + 10, rect.bottom - count_label.get_height() - 6))
+            if save.get("nodes"):
+                thumbnail = self._get_thumbnail(save, rect.size)
+                if thumbnail:
+                    self.screen.blit(thumbnail, rect.topleft)
             delete_rect = self._delete_rect(rect)
             hover = delete_rect.collidepoint(pygame.mouse.get_pos())
             color = (200, 80, 80) if hover else (150, 50, 50)
@@ -266,36 +272,58 @@ class SaveMenu:
         y = grid.y + padding + row * (slot_h + padding)
         return pygame.Rect(x, y, slot_w, slot_h)
 
-    def _draw_preview(self, data, rect):
+    def _get_thumbnail(self, save, size):
+        key = (save["path"], save.get("mtime"), size)
+        if key in self.thumbnails:
+            self.thumbnails.move_to_end(key)
+            return self.thumbnails[key]
+
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        try:
+            data = save_manager.load_machine(save["name"], workshop =(self.active_tab == "Workshop Machines"))
+            self._draw_preview(surface, data, surface.get_rect(), save.get("bbox"))
+        except Exception as e:
+            print("Error drawing preview:", e)
+            surface = None
+
+        self.thumbnails[key] = surface
+        if len(self.thumbnails) > THUMBNAIL_CACHE_SIZE:
+            self.thumbnails.popitem(last=False)
+        return surface
+
+    def _draw_preview(self, surface, data, rect, bbox=None):
         nodes = data.get("nodes", [])
         conns = data.get("connections", [])
         if not nodes:
             return
-        xs = [n["x"] for n in nodes]
-        ys = [n["y"] for n in nodes]
-        minx, maxx = min(xs), max(xs)
-        miny, maxy = min(ys), max(ys)
+        if bbox:
+            minx, miny, maxx, maxy = bbox
+        else:
+            xs = [n["x"] for n in nodes]
+            ys = [n["y"] for n in nodes]
+            minx, maxx = min(xs), max(xs)
+            miny, maxy = min(ys), max(ys)
         w, h = (maxx - minx or 1), (maxy - miny or 1)
         scale = min((rect.width-40) / w, (rect.height-40) / h)
         cx, cy = rect.centerx, rect.centery + 15
+        by_id = {n.get("uid", n["id"]): n for n in nodes}
 
         for c in conns:
-            try:
-                s = next(n for n in nodes if n["id"] == c["start"])
-                e = next(n for n in nodes if n["id"] == c["end"])
-            except StopIteration:
+            s = by_id.get(c.get("start_uid", c["start"]))
+            e = by_id.get(c.get("end_uid", c["end"]))
+            if s is None or e is None:
                 continue
             sx = cx + (s["x"] - minx - w/2) * scale
             sy = cy + (s["y"] - miny - h/2) * scale
             ex = cx + (e["x"] - minx - w/2) * scale
             ey = cy + (e["y"] - miny - h/2) * scale
-            pygame.draw.line(self.screen, (100, 150, 200), (sx, sy), (ex, ey), 2)
+            pygame.draw.line(surface, (100, 150, 200), (sx, sy), (ex, ey), 2)
 
         for n in nodes:
             nx = cx + (n["x"] - minx - w/2) * scale
             ny = cy + (n["y"] - miny - h/2) * scale
             color = (90, 220, 120) if n["is_start"] else (220, 100, 100) if n["is_end"] else (200, 200, 200)
-            pygame.draw.circle(self.screen, color, (int(nx), int(ny)), 5)
+            pygame.draw.circle(surface, color, (int(nx), int(ny)), 5)
 
     def _draw_input_box(self):
         w, h = self.screen.get_size()
@@ -0,0 +1,77 @@
+import math
+
+
+class SpatialIndex:
+    def __init__(self, cell_size=130):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.items = {}
+        self._order = 0
+
+    def clear(self):
+        self.cells.clear()
+        self.items.clear()
+        self._order = 0
+
+    def _keys(self, minx, miny, maxx, maxy):
+        size = self.cell_size
+        for cx in range(math.floor(minx / size), math.floor(maxx / size) + 1):
+            for cy in range(math.floor(miny / size), math.floor(maxy / size) + 1):
+                yield cx, cy
+
+    def insert(self, item, bbox):
+        previous = self.items.get(item)
+        if previous is not None:
+            if previous[1] == bbox:
+                return
+            self._unlink(item, previous[0])
+            order = previous[2]
+        else:
+            self._order += 1
+            order = self._order
+
+        keys = list(self._keys(*bbox))
+        for key in keys:
+            self.cells.setdefault(key, []).append(item)
+        self.items[item] = (keys, bbox, order)
+
+    def remove(self, item):
+        entry = self.items.pop(item, None)
+        if entry is not None:
+            self._unlink(item, entry[0])
+
+    def _unlink(self, item, keys):
+        for key in keys:
+            bucket = self.cells.get(key)
+            if bucket is None:
+                continue
+            if item in bucket:
+                bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def query_point(self, x, y, radius=0):
+        found = set()
+        for key in self._keys(x - radius, y - radius, x + radius, y + radius):
+            for item in self.cells.get(key, ()):
+                if item in found:
+                    continue
+                minx, miny, maxx, maxy = self.items[item][1]
+                if minx - radius <= x <= maxx + radius and miny - radius <= y <= maxy + radius:
+                    found.add(item)
+        return sorted(found, key=lambda item: self.items[item][2])
+
+    def query_rect(self, minx, miny, maxx, maxy):
+        size = self.cell_size
+        span = (math.floor(maxx / size) - math.floor(minx / size) + 1) * (math.floor(maxy / size) - math.floor(miny / size) + 1)
+        if span > len(self.cells):
+            candidates = self.items
+        else:
+            candidates = {item for key in self._keys(minx, miny, maxx, maxy) for item in self.cells.get(key, ())}
+
+        found = []
+        for item in candidates:
+            ix0, iy0, ix1, iy1 = self.items[item][1]
+            if ix0 <= maxx and ix1 >= minx and iy0 <= maxy and iy1 >= miny:
+                found.append(item)
+        return sorted(found, key=lambda item: self.items[item][2])
@@ -1,11 +1,15 @@
+import math
+
 import pygame
 from MainMenu import COLORS
 from FontManager import FontManager
+from TapeBuffer import TapeBuffer
 
 
 class Tape:
-    def __init__(self, screen, tape_string="", base_y_ratio=0.9):
+    def __init__(self, screen, tape_string="", base_y_ratio=0.9, alphabet=None):
         self.screen = screen
+        self.alphabet = alphabet or ["0", "1", "_"]
         self.cell_count = len(tape_string) + 10
         self.speed = 400
 
@@ -35,9 +39,11 @@ class Tape:
         scale = self.get_scale()
         return h * 0.12 * scale
 
+    def get_font_size(self):
+        return FontManager.quantize(48 * self.get_scale())
+
     def get_font(self):
-        scale = self.get_scale()
-        return FontManager.get(int(48 * scale), bold=False)
+        return FontManager.get(self.get_font_size(), bold=False)
 
     def show(self):
         self.visible = True
@@ -49,24 +55,21 @@ class Tape:
         self.animating = True
 
     def change_tape(self, tape_string):
-        half = (self.cell_count - len(tape_string)) // 2
-        self.symbols = ["_"] * half + list(tape_string) + ["_"] * (self.cell_count - len(tape_string) - half)
-        self.cell_index = half
+        padding = max(0, self.cell_count - len(tape_string))
+        half = padding // 2
+        self.symbols = TapeBuffer(tape_string, pad_left=half, pad_right=padding - half)
+        self.cell_index = 0
         self.offset = self.cell_index * self.get_cell_width()
         self.target_offset = self.offset
 
     def move_head(self, direction):
-        new_index = self.cell_index + direction
-
-        if new_index < 0:
-            self.symbols.insert(0, "_")
-            new_index = 0
-        elif new_index >= len(self.symbols):
-            self.symbols.append("_")
-
-        self.cell_index = max(0, min(new_index, len(self.symbols) - 1))
+        self.cell_index += direction
+        self.symbols.ensure(self.cell_index)
         self.target_offset = self.cell_index * self.get_cell_width()
 
+    def snap(self):
+        self.offset = self.target_offset
+
     def update(self, dt):
         if abs(self.target_y - self.y_offset) > 1:
             direction = 1 if self.target_y > self.y_offset else -1
@@ -86,6 +89,13 @@ class Tape:
             if (direction > 0 and self.offset > self.target_offset) or (direction < 0 and self.offset < self.target_offset):
                 self.offset = self.target_offset
 
+    def get_rect(self):
+        w, h = self.screen.get_size()
+        cell_h = self.get_cell_height()
+        base_y = h * self.base_y_ratio + self.y_offset
+        top = base_y - cell_h / 1.5 - 2
+        return pygame.Rect(0, top, w, base_y + cell_h / 2 + 2 - top)
+
     def draw(self):
         if not self.visible:
             return
@@ -94,7 +104,8 @@ class Tape:
         scale = self.get_scale()
         cell_w = self.get_cell_width()
         cell_h = self.get_cell_height()
-        font = self.get_font()
+        font_size = self.get_font_size()
+        glyphs = FontManager.glyph_atlas(self.alphabet, font_size, COLORS["text"])
 
         base_y = h * self.base_y_ratio + self.y_offset
         start_x = w / 2 - self.offset
@@ -102,13 +113,15 @@ class Tape:
         tape_y = base_y + cell_h / 2
         pygame.draw.rect(self.screen, (20, 30, 50), (0, tape_y - 5 * scale, w, 10 * scale))
 
-        for i, symbol in enumerate(self.symbols):
+        first = math.floor((-cell_w - start_x) / cell_w)
+        last = math.ceil((w - start_x) / cell_w) + 1
+        for i, symbol in self.symbols.cells(first, last):
             x = start_x + i * cell_w
             rect = pygame.Rect(x, base_y - cell_h / 2, cell_w - 4 * scale, cell_h)
             pygame.draw.rect(self.screen, self.cell_color, rect, border_radius=8)
             pygame.draw.rect(self.screen, self.border_color, rect, int(2 * scale), border_radius=8)
 
-            label = font.render(symbol, True, COLORS["text"])
+            label = glyphs.get(symbol) or FontManager.render(symbol, font_size, COLORS["text"], bold=False)
             label_rect = label.get_rect(center=rect.center)
             self.screen.blit(label, label_rect)
 
@@ -121,10 +134,10 @@ class Tape:
         ])
 
     def read_symbol(self):
-        return self.symbols[self.cell_index]
+        return self.symbols.read(self.cell_index)
 
     def write_symbol(self, symbol):
-        self.symbols[self.cell_index] = symbol
+        self.symbols.write(self.cell_index, symbol)
 
     def move_left(self):
         self.move_head(-1)
@@ -133,9 +146,10 @@ class Tape:
         self.move_head(1)
 
     def reset(self):
-        self.cell_index = self.symbols.index(next((s for s in self.symbols if s != "_"), "_"))
+        first = self.symbols.first_non_blank()
+        self.cell_index = first if first is not None else self.symbols.bounds()[0]
         self.offset = self.cell_index * self.get_cell_width()
         self.target_offset = self.offset
 
     def get_tape_string(self):
-        return "".join(s for s in self.symbols if s != "_")
+        return self.symbols.to_string()
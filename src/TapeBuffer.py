@@ -0,0 +1,61 @@
+class TapeBuffer:
+    def __init__(self, tape_string="", blank="_", pad_left=0, pad_right=0):
+        self.blank = blank
+        self.load(tape_string, pad_left, pad_right)
+
+    def load(self, tape_string, pad_left=0, pad_right=0):
+        self._right = list(tape_string) + [self.blank] * pad_right
+        self._left = [self.blank] * pad_left
+        self.content_hash = 0
+        for index, symbol in enumerate(tape_string):
+            if symbol != self.blank:
+                self.content_hash ^= hash((index, symbol))
+
+    def bounds(self):
+        return -len(self._left), len(self._right)
+
+    def __len__(self):
+        return len(self._left) + len(self._right)
+
+    def ensure(self, index):
+        while index >= len(self._right):
+            self._right.append(self.blank)
+        while index < -len(self._left):
+            self._left.append(self.blank)
+
+    def read(self, index):
+        if index >= 0:
+            return self._right[index] if index < len(self._right) else self.blank
+        index = -index - 1
+        return self._left[index] if index < len(self._left) else self.blank
+
+    def write(self, index, symbol):
+        previous = self.read(index)
+        if previous != self.blank:
+            self.content_hash ^= hash((index, previous))
+        if symbol != self.blank:
+            self.content_hash ^= hash((index, symbol))
+
+        self.ensure(index)
+        if index >= 0:
+            self._right[index] = symbol
+        else:
+            self._left[-index - 1] = symbol
+
+    def cells(self, start=None, stop=None):
+        lo, hi = self.bounds()
+        start = lo if start is None else max(lo, start)
+        stop = hi if stop is None else min(hi, stop)
+        for index in range(start, min(stop, 0)):
+            yield index, self._left[-index - 1]
+        for index in range(max(start, 0), stop):
+            yield index, self._right[index]
+
+    def snapshot(self):
+        return tuple((index, symbol) for index, symbol in self.cells() if symbol != self.blank)
+
+    def first_non_blank(self):
+        return next((index for index, symbol in self.cells() if symbol != self.blank), None)
+
+    def to_string(self):
+        return "".join(symbol for _, symbol in self.cells() if symbol != self.blank)
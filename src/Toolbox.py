@@ -111,6 +111,11 @@ class Toolbox:
                 label_y = self.hover_label_tool.center[1] - surf.get_height() // 2
                 self.screen.blit(surf, (label_x, label_y))
 
+    def get_rect(self):
+        cx, cy = self.toggle_button.center
+        height = cy + self.radius + self.spacing * len(self.tools) + 10
+        return pygame.Rect(0, 0, cx + self.radius + 160, height)
+
     def handle_event(self, event):
         if self.animation_locked:
             return False
@@ -1,7 +1,13 @@
+import time
+
 import pygame
 from MainMenu import COLORS
 from FontManager import FontManager
 
+TURBO_LEVELS = [0, 1, 4, 16, 64, 256, None]
+TURBO_BUDGET = 0.006
+HALT_BUDGET = 0.012
+
 
 class TuringMachine:
     def __init__(self, screen, nodes, connections, tape, tape2=None, double_tape=False, alphabet = None):
@@ -16,6 +22,9 @@ class TuringMachine:
         self.input_text = ""
         self.alphabet = alphabet if alphabet is not None else ['_']
 
+        self.transitions = {}
+        self.compile_transitions()
+
         self.current_node = next((n for n in nodes if getattr(n, "is_start", False)), None)
         if self.current_node:
             self.current_node.is_active = True
@@ -25,10 +34,13 @@ class TuringMachine:
         self.finished = False
         self.timer = 0
         self.step_delay = 0.8
+        self.steps = 0
+        self.turbo = 0
+        self.run_to_halt = False
 
         self.target_width = 260
         self.current_width = 0
-        self.height = 300
+        self.height = 390
         self.animation_speed = 480
         self.open = False
 
@@ -38,7 +50,10 @@ class TuringMachine:
         self.buttons = {}
         self.hovered_button = None
         self.toggle_rect = None
+        self.panel_rect = None
         self.toggle_hovered = False
+        self.slider_rect = None
+        self.dragging_slider = False
 
 
     def update(self, dt):
@@ -50,11 +65,40 @@ class TuringMachine:
             self.current_width = target
 
         if self.running and not self.paused and not self.finished:
-            self.timer += dt
-            if self.timer >= self.step_delay:
-                self.step()
-                self.timer = 0
-    def step(self):
+            if self.run_to_halt:
+                self._run_batch(None, HALT_BUDGET)
+            elif TURBO_LEVELS[self.turbo] != 0:
+                self._run_batch(TURBO_LEVELS[self.turbo], TURBO_BUDGET)
+            else:
+                self.timer += dt
+                if self.timer >= self.step_delay:
+                    self.step()
+                    self.timer = 0
+
+    def _run_batch(self, limit, budget):
+        deadline = time.perf_counter() + budget
+        count = 0
+        while not self.finished and (limit is None or count < limit):
+            self.step(animate=False)
+            count += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.tape.snap()
+        if self.double_tape and self.tape2:
+            self.tape2.snap()
+        if self.finished:
+            self.run_to_halt = False
+
+    def start_run_to_halt(self):
+        if not self.current_node:
+            return
+        if not self.running or self.finished:
+            self.play()
+        self.paused = False
+        self.run_to_halt = True
+
+    def step(self, animate=True):
         if not self.current_node:
             self.finished = True
             return
@@ -67,20 +111,7 @@ class TuringMachine:
         s1 = self.tape.read_symbol()
         s2 = self.tape2.read_symbol() if self.double_tape and self.tape2 else None
 
-        valid_conn = None
-        for conn in self.connections:
-            if conn.start is not self.current_node:
-                continue
-
-            if self.double_tape and self.tape2:
-                if s1 in conn.read and (not conn.read2 or s2 in conn.read2):
-                    valid_conn = conn
-                    break
-            else:
-                if s1 in conn.read:
-                    valid_conn = conn
-                    break
-
+        valid_conn = self.find_transition(self.current_node, s1, s2)
         if not valid_conn:
             self.finished = True
             self.running = False
@@ -104,15 +135,43 @@ class TuringMachine:
         self.current_node.is_active = False
         self.current_node = valid_conn.end
         self.current_node.is_active = True
+        self.steps += 1
 
-        self.tape.show()
-        if self.double_tape and self.tape2:
-            self.tape2.show()
+        if animate:
+            self.tape.show()
+            if self.double_tape and self.tape2:
+                self.tape2.show()
 
         if getattr(self.current_node, "is_end", False):
             self.finished = True
             self.running = False
 
+    def compile_transitions(self):
+        self.transitions = {}
+        double = self.double_tape and self.tape2
+        for order, conn in enumerate(self.connections):
+            state = conn.start
+            for s1 in conn.read:
+                if not double:
+                    self.transitions.setdefault((state, s1), (order, conn))
+                elif not conn.read2:
+                    self.transitions.setdefault((state, s1, None), (order, conn))
+                else:
+                    for s2 in conn.read2:
+                        self.transitions.setdefault((state, s1, s2), (order, conn))
+
+    def find_transition(self, state, s1, s2=None):
+        if not (self.double_tape and self.tape2):
+            match = self.transitions.get((state, s1))
+            return match[1] if match else None
+
+        exact = self.transitions.get((state, s1, s2))
+        wildcard = self.transitions.get((state, s1, None))
+        if exact and wildcard:
+            return min(exact, wildcard, key=lambda m: m[0])[1]
+        match = exact or wildcard
+        return match[1] if match else None
+
     def play(self):
         if not self.current_node:
             return
@@ -128,6 +187,7 @@ class TuringMachine:
     def pause(self):
         if self.running:
             self.paused = not self.paused
+            self.run_to_halt = False
 
     def reset(self):
         self.current_node = next((n for n in self.nodes if getattr(n, "is_start", False)), None)
@@ -142,6 +202,8 @@ class TuringMachine:
         self.finished = False
         self.running = False
         self.paused = True
+        self.run_to_halt = False
+        self.steps = 0
 
     def draw(self):
         sw, sh = self.screen.get_size()
@@ -164,6 +226,7 @@ class TuringMachine:
             pygame.draw.polygon(self.screen, COLORS["text"], [(cx-4,cy), (cx+4,cy-8), (cx+4,cy+8)])
 
         if self.current_width <= 4:
+            self.panel_rect = None
             return
 
         panel_y = sh / 2 - self.height / 2
@@ -173,6 +236,7 @@ class TuringMachine:
         panel_x = start_x - (start_x - target_x) * open_ratio
 
         rect = pygame.Rect(panel_x, panel_y, self.target_width, self.height)
+        self.panel_rect = rect
         shadow = rect.move(-5, 5)
         pygame.draw.rect(self.screen, (0, 0, 0, 100), shadow, border_radius=16)
         pygame.draw.rect(self.screen, (30, 35, 60), rect, border_radius=16)
@@ -186,8 +250,10 @@ class TuringMachine:
         state_label = self.small_font.render(f"State: {status}", True, status_color)
         node_text = f"Current: q{self.current_node.id}" if self.current_node else "Current: —"
         node_label = self.small_font.render(node_text, True, COLORS["text"])
+        steps_label = self.small_font.render(f"Steps: {self.steps}", True, COLORS["text"])
         self.screen.blit(state_label, (rect.x + 22, rect.y + 68))
         self.screen.blit(node_label, (rect.x + 22, rect.y + 96))
+        self.screen.blit(steps_label, (rect.x + 140, rect.y + 96))
 
         bx = rect.x + 22
         by = rect.y + 145
@@ -198,11 +264,15 @@ class TuringMachine:
             "reset": pygame.Rect(bx, by + 58, 88, 40),
             "Show/Hide Tape": pygame.Rect(bx + spacing, by + 58, 120, 40),
             "Test Word": pygame.Rect(bx, by + 100, 188, 40),
+            "Run to Halt": pygame.Rect(bx, by + 190, 188, 40),
         }
         for name, r in self.buttons.items():
             hovered = (self.hovered_button == name)
             self._draw_button(r, name, hovered)
 
+        self.slider_rect = pygame.Rect(bx, by + 170, 188, 8)
+        self._draw_speed_slider()
+
         if self.input_active:
             self._draw_input_box()
 
@@ -221,7 +291,14 @@ class TuringMachine:
                 else:
                     return
 
+        if event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging_slider = False
+
         if event.type == pygame.MOUSEMOTION:
+            if self.dragging_slider and not event.buttons[0]:
+                self.dragging_slider = False
+            if self.dragging_slider:
+                self._set_turbo_from_x(event.pos[0])
             self.hovered_button = None
             self.toggle_hovered = self.toggle_rect and self.toggle_rect.collidepoint(event.pos)
             for name, rect in self.buttons.items():
@@ -235,6 +312,10 @@ class TuringMachine:
                 return
 
             if self.open and self.current_width > 10:
+                if self.slider_rect and self.slider_rect.inflate(16, 20).collidepoint(event.pos):
+                    self.dragging_slider = True
+                    self._set_turbo_from_x(event.pos[0])
+                    return
                 for name, rect in self.buttons.items():
                     if rect.collidepoint(event.pos):
                         if name == "play_pause":
@@ -259,8 +340,32 @@ class TuringMachine:
                             self.input_active = True
                             self.input_text = ""
                             return
+                        elif name == "Run to Halt":
+                            self.start_run_to_halt()
                         return
 
+    def _set_turbo_from_x(self, x):
+        ratio = (x - self.slider_rect.x) / self.slider_rect.width
+        self.turbo = max(0, min(len(TURBO_LEVELS) - 1, round(ratio * (len(TURBO_LEVELS) - 1))))
+
+    def _draw_speed_slider(self):
+        level = TURBO_LEVELS[self.turbo]
+        if level == 0:
+            text = "Speed: Normal"
+        elif level is None:
+            text = "Speed: Max"
+        else:
+            text = f"Speed: {level} steps/frame"
+        label = self.small_font.render(text, True, COLORS["text"])
+        self.screen.blit(label, (self.slider_rect.x, self.slider_rect.y - 24))
+
+        pygame.draw.rect(self.screen, (60, 70, 100), self.slider_rect, border_radius=4)
+        fill = self.slider_rect.copy()
+        fill.width = self.slider_rect.width * self.turbo / (len(TURBO_LEVELS) - 1)
+        pygame.draw.rect(self.screen, COLORS["accent"], fill, border_radius=4)
+        knob_x = self.slider_rect.x + fill.width
+        pygame.draw.circle(self.screen, COLORS["text"], (int(knob_x), self.slider_rect.centery), 8)
+
     def _draw_button(self, rect, name, hovered):
         if name == "play_pause":
             label = "Play" if (not self.running or self.paused) else "Pause"
@@ -274,6 +379,9 @@ class TuringMachine:
         elif name == "Test Word":
             label = "Set Tape Word"
             base = (90, 160, 220)
+        elif name == "Run to Halt":
+            label = "Running..." if self.run_to_halt else "Run to Halt"
+            base = (200, 150, 60)
         else:
             label = "Reset"
             base = (200, 90, 90)
@@ -313,6 +421,7 @@ class TuringMachine:
             "nodes": [
                 {
                     "id": n.id,
+                    "uid": n.uid,
                     "x": n.pos.x,
                     "y": n.pos.y,
                     "is_start": getattr(n, "is_start", False),
@@ -324,6 +433,8 @@ class TuringMachine:
                 {
                     "start": c.start.id,
                     "end": c.end.id,
+                    "start_uid": c.start.uid,
+                    "end_uid": c.end.uid,
                     "read": c.read,
                     "write": c.write,
                     "move": c.move,
@@ -352,11 +463,11 @@ class TuringMachine:
             )
             node.id = ndata["id"]
             self.nodes.append(node)
-            id_to_node[node.id] = node
+            id_to_node[ndata.get("uid", node.id)] = node
 
         for cdata in data.get("connections", []):
-            start = id_to_node.get(cdata["start"])
-            end = id_to_node.get(cdata["end"])
+            start = id_to_node.get(cdata.get("start_uid", cdata["start"]))
+            end = id_to_node.get(cdata.get("end_uid", cdata["end"]))
             if not start or not end:
                 continue
             conn = Connection(start, end)
@@ -366,6 +477,7 @@ class TuringMachine:
                 if connection.start == start and connection.end == end:
                     conn.label_offset += 15
 
+        self.compile_transitions()
         self.current_node = next((n for n in self.nodes if getattr(n, "is_start", False)), None)
         self.finished = False
         self.running = False
@@ -387,11 +499,11 @@ class TuringMachine:
             )
             node.id = ndata["id"]
             nodes.append(node)
-            id_to_node[node.id] = node
+            id_to_node[ndata.get("uid", node.id)] = node
 
         for cdata in machine_data.get("connections", []):
-            start = id_to_node.get(cdata["start"])
-            end = id_to_node.get(cdata["end"])
+            start = id_to_node.get(cdata.get("start_uid", cdata["start"]))
+            end = id_to_node.get(cdata.get("end_uid", cdata["end"]))
             if not start or not end:
                 continue
             conn = Connection(start, end)
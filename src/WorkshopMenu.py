@@ -56,23 +56,34 @@ class WorkshopMenu:
         self._buttons_dirty = True
 
         self.add_menu = None
+        self.loading = False
+        self._request_id = 0
 
         self.refresh_items()
 
 
     def refresh_items(self, query=""):
+        print("Fetching workshop items...")
+        self._request_id += 1
+        request_id = self._request_id
+        self.loading = True
+        request_helper.run_async(request_helper.get_workshop_items, query,
+                                 on_done=lambda data: self._on_items_loaded(request_id, data))
+
+    def _on_items_loaded(self, request_id, data):
+        if request_id != self._request_id:
+            return
+        self.loading = False
         try:
-            print("Fetching workshop items...")
-            data = request_helper.get_workshop_items(query)
             self.items = data["LevelItems"] + data["MachineItems"]
-
-            self._filter_items()
-            self.page = 0
-            self._buttons_dirty = True
         except Exception as e:
             print("Failed to load workshop items:", e)
             self.items = []
 
+        self._filter_items()
+        self.page = 0
+        self._buttons_dirty = True
+
     def _filter_items(self):
         self.items = [i for i in self.items if i.get("author") != "TuringSandbox"]
 
@@ -108,7 +119,10 @@ class WorkshopMenu:
         return max(1, ((len(self.filtered_items) - 1) // PAGE_SIZE) + 1)
 
     def _toggle_subscription(self, item):
-        success = request_helper.toggle_subscription(item["id"])
+        request_helper.run_async(request_helper.toggle_subscription, item["id"],
+                                 on_done=lambda success: self._on_subscription_toggled(item, success))
+
+    def _on_subscription_toggled(self, item, success):
         if success:
             item["userIsSubscribed"] = not item["userIsSubscribed"]
             self._buttons_dirty = True
@@ -122,7 +136,10 @@ class WorkshopMenu:
                 save_manager.delete_workshop_item(item["name"], is_level=False)
             self.refresh_items(self.search_query)
     def _rate_item(self, item, rating: int):
-        ok = request_helper.rate_workshop_item(item["id"], rating)
+        request_helper.run_async(request_helper.rate_workshop_item, item["id"], rating,
+                                 on_done=lambda ok: self._on_item_rated(item, rating, ok))
+
+    def _on_item_rated(self, item, rating, ok):
         if ok:
             item["userRating"] = rating
             print(f"Rated item {item['name']} with {rating} stars")
@@ -248,6 +265,11 @@ class WorkshopMenu:
 
         visible = self.filtered_items[self.page * PAGE_SIZE:(self.page + 1) * PAGE_SIZE]
 
+        if self.loading and not visible:
+            msg = self.font_body.render("Loading workshop items...", True, COLORS["text"])
+            self.screen.blit(msg, msg.get_rect(center=(w // 2, h // 2)))
+            return
+
         if self._buttons_dirty:
             self._card_buttons_cache.clear()
             for i, item in enumerate(visible):
@@ -361,7 +383,10 @@ class WorkshopMenu:
         if not confirm:
             return
 
-        success = request_helper.delete_workshop_item(item["id"])
+        request_helper.run_async(request_helper.delete_workshop_item, item["id"],
+                                 on_done=lambda success: self._on_item_deleted(item, success))
+
+    def _on_item_deleted(self, item, success):
         if success:
             print(f"Deleted workshop item {item['name']}")
             self.items = [i for i in self.items if i["id"] != item["id"]]
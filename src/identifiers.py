@@ -0,0 +1,10 @@
+import itertools
+import secrets
+
+SESSION_PREFIX = secrets.token_hex(4)
+
+_counter = itertools.count(1)
+
+
+def new_uid():
+    return f"{SESSION_PREFIX}-{next(_counter)}"
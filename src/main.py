@@ -1,3 +1,5 @@
+import ctypes
+import multiprocessing
 import os
 import platform
 
@@ -9,45 +11,53 @@ from Environment import Environment
 from LevelSelectMenu import LevelSelectMenu
 from SettingsMenu import SettingsMenu
 from LobbyMenu import LobbyMenu
+from FrameScheduler import FrameScheduler
 import request_helper
-
-pygame.init()
-import ctypes
+import save_manager
+import simulator
 
 DISCORD_CLIENT_ID = "1428136659047809034"
-rpc = None
-try:
-    rpc = pypresence.Presence(DISCORD_CLIENT_ID)
-    rpc.connect()
-except Exception as e:
-    print("Could not connect to Discord:", e)
-
 SCREEN_WIDTH, SCREEN_HEIGHT = 900, 600
 WINDOW_TITLE = "Turing Machine Sandbox"
 
-if hasattr(sys, "_MEIPASS"):
-    icon_path = os.path.join(sys._MEIPASS, "assets", "favicon.ico")
-else:
-    icon_path = os.path.join("assets", "favicon.ico")
+rpc = None
+screen = None
+clock = None
+
+
+def init():
+    global rpc, screen, clock
+    pygame.init()
 
-try:
-    icon_surface = pygame.image.load(icon_path)
-    pygame.display.set_icon(icon_surface)
-except Exception as e:
-    print("Not able to load icon:", e)
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+    try:
+        rpc = pypresence.Presence(DISCORD_CLIENT_ID)
+        rpc.connect()
+    except Exception as e:
+        print("Could not connect to Discord:", e)
+
+    if hasattr(sys, "_MEIPASS"):
+        icon_path = os.path.join(sys._MEIPASS, "assets", "favicon.ico")
+    else:
+        icon_path = os.path.join("assets", "favicon.ico")
 
-if platform.system() == "Windows":
     try:
-        hwnd = pygame.display.get_wm_info().get("window")
-        if hwnd:
-            ctypes.windll.user32.ShowWindow(hwnd, 3)
+        icon_surface = pygame.image.load(icon_path)
+        pygame.display.set_icon(icon_surface)
     except Exception as e:
-        print("Could not maximize window:", e)
+        print("Not able to load icon:", e)
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.RESIZABLE)
+
+    if platform.system() == "Windows":
+        try:
+            hwnd = pygame.display.get_wm_info().get("window")
+            if hwnd:
+                ctypes.windll.user32.ShowWindow(hwnd, 3)
+        except Exception as e:
+            print("Could not maximize window:", e)
 
-pygame.display.set_caption(WINDOW_TITLE)
+    pygame.display.set_caption(WINDOW_TITLE)
 
-clock = pygame.time.Clock()
+    clock = pygame.time.Clock()
 
 
 def main():
@@ -60,11 +70,16 @@ def main():
     previous_state = None
     discord_available = True
     sandbox_alphabet = ['0', '1', '_']
+    scheduler = FrameScheduler(clock)
+    busy = True
 
     running = True
     while running:
-        dt = clock.tick(60) / 1000
+        dt = scheduler.tick(busy)
+        dirty_rects = None
+        request_helper.dispatch_completed()
         for event in pygame.event.get():
+            scheduler.wake()
             if event.type == pygame.QUIT:
                 running = False
 
@@ -135,6 +150,7 @@ def main():
                 state = "main_menu"
 
         elif state == "multiplayer":
+            multiplayer_menu.process_inbound()
             if multiplayer_menu.in_environment:
                 multiplayer_menu.environment.update(dt)
                 if multiplayer_menu.environment.multiplayer_left:
@@ -149,7 +165,7 @@ def main():
 
         elif state == "environment":
             env.update(dt)
-            env.draw()
+            dirty_rects = env.draw()
 
             if env.back_to_menu and not env.levelselection:
                 menu = MainMenu(screen)
@@ -182,11 +198,27 @@ def main():
                 print("Discord RPC error:", ex)
                 discord_available = False
 
-        pygame.display.flip()
+        if state == "main_menu":
+            busy = True
+        elif state == "environment":
+            busy = env is not None and env.is_busy()
+        elif state == "multiplayer":
+            busy = bool(multiplayer_menu.inbound) or bool(multiplayer_menu.in_environment and multiplayer_menu.environment and multiplayer_menu.environment.is_busy())
+        else:
+            busy = False
+
+        if dirty_rects is not None:
+            pygame.display.update(dirty_rects)
+        else:
+            pygame.display.flip()
 
+    simulator.shutdown_pool()
+    save_manager.flush_writes()
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    init()
     main()
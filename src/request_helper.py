@@ -1,9 +1,15 @@
 import os
 import json
+import time
+import base64
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import TuringMachine
 import Level
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 
 SESSION_PATH = os.path.expanduser("~/Documents/Turing Sandbox Saves/Auth/session.json")
 WORKSHOP_DIR = os.path.expanduser("~/Documents/Turing Sandbox Saves/workshop")
@@ -28,29 +34,82 @@ VERIFY_SSL = True
 #LEADERBOARD_URL = "https://localhost:7054/leaderboard"
 #VERIFY_SSL = False
 
-
+REQUEST_TIMEOUT = (4, 7)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+VERIFY_TTL = 300
+VERIFY_REFRESH_AFTER = 0.75
+TOKEN_EXPIRY_MARGIN = 30
+
+
+def _create_http_session():
+    retry = Retry(
+        total=3,
+        connect=0,
+        read=0,
+        other=0,
+        backoff_factor=0.4,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "HEAD", "DELETE"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"Connection": "keep-alive"})
+    session.hooks["response"].append(_on_response)
+    return session
+
+
+def _on_response(response, *args, **kwargs):
+    if response.status_code == 401:
+        invalidate_verification()
+
+
+_http = _create_http_session()
+
+_session_data = None
+_session_lock = threading.Lock()
+_verified = None
+_verify_refreshing = False
+_verify_lock = threading.Lock()
+
+
+def _get_session_data():
+    global _session_data
+    with _session_lock:
+        if _session_data is None:
+            try:
+                with open(SESSION_PATH, "r", encoding="utf-8") as f:
+                    _session_data = json.load(f)
+            except Exception:
+                _session_data = {}
+        return _session_data
 
 
 def save_session(token: str, user: dict):
+    global _session_data
     os.makedirs(os.path.dirname(SESSION_PATH), exist_ok=True)
-    with open(SESSION_PATH, "w", encoding="utf-8") as f:
-        json.dump({"token": token, "user": user}, f, indent=2)
+    with _session_lock:
+        with open(SESSION_PATH, "w", encoding="utf-8") as f:
+            json.dump({"token": token, "user": user}, f, indent=2)
+        _session_data = {"token": token, "user": user}
+    invalidate_verification()
 
 
 def load_session():
-    if not os.path.exists(SESSION_PATH):
+    data = _get_session_data()
+    if not data:
         return None, None
     try:
-        with open(SESSION_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            token = data.get("token")
-            user = data.get("user", {})
-            if token is not None and user is not None:
-
-                return token, user
+        token = data.get("token")
+        user = data.get("user", {})
+        if token is not None and user is not None:
+            return token, user
         headers = {"Authorization": f"Bearer {token}"}
         debug_requests("load_session")
-        r = requests.get(AUTH_VERIFY_URL, headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(AUTH_VERIFY_URL, headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
 
         if r.status_code == 200:
             verified = r.json()
@@ -72,48 +131,121 @@ def load_session():
 
 
 def clear_session():
-    if os.path.exists(SESSION_PATH):
-        os.remove(SESSION_PATH)
+    global _session_data
+    with _session_lock:
+        if os.path.exists(SESSION_PATH):
+            os.remove(SESSION_PATH)
+        _session_data = {}
+    invalidate_verification()
 
 
 def get_auth_headers():
     token, _ = load_session()
     return {"Authorization": f"Bearer {token}"} if token else {}
 
+def _token_expiry(token):
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get("exp")
+        return float(exp) if exp else None
+    except Exception:
+        return None
+
+
+def _remember_verified(token):
+    global _verified
+    now = time.time()
+    expires = now + VERIFY_TTL
+    token_expiry = _token_expiry(token)
+    if token_expiry is not None:
+        expires = min(expires, token_expiry - TOKEN_EXPIRY_MARGIN)
+    with _verify_lock:
+        _verified = (token, now, expires) if expires > now else None
+
+
+def invalidate_verification():
+    global _verified
+    with _verify_lock:
+        _verified = None
+
+
+def _refresh_verification(token):
+    global _verify_refreshing
+    try:
+        _check_token(token, clear_on_error=False)
+    finally:
+        with _verify_lock:
+            _verify_refreshing = False
+
+
+def _refresh_in_background(token):
+    global _verify_refreshing
+    with _verify_lock:
+        if _verify_refreshing:
+            return
+        _verify_refreshing = True
+    _executor.submit(_refresh_verification, token)
+
+
 def verify_authentication():
-    debug_requests("verify_authentication")
     token, user = load_session()
     if not token:
         return False
+
+    with _verify_lock:
+        cached = _verified if _verified and _verified[0] == token else None
+    now = time.time()
+    if cached and now < cached[2]:
+        checked, expires = cached[1], cached[2]
+        if now - checked > (expires - checked) * VERIFY_REFRESH_AFTER:
+            _refresh_in_background(token)
+        return True
+    return _check_token(token)
+
+
+def _check_token(token, clear_on_error=True):
+    debug_requests("verify_authentication")
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        r = requests.get(AUTH_VERIFY_URL, headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(AUTH_VERIFY_URL, headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             verified = r.json()
-            return verified.get("valid", False)
-        elif r.status_code == 429:
+            valid = verified.get("valid", False)
+            if valid:
+                _remember_verified(token)
+            else:
+                invalidate_verification()
+            return valid
+        elif r.status_code in (401, 403):
+            print(f"Token invalid (status {r.status_code}).")
+            if clear_on_error:
+                clear_session()
+            else:
+                invalidate_verification()
             return False
         else:
-            print(f"Token invalid (status {r.status_code}), clearing session.")
-            clear_session()
+            print(f"Session verification unavailable (status {r.status_code}).")
             return False
     except Exception as e:
         print("Session verification failed:", e)
-        clear_session()
+        invalidate_verification()
+        return False
 
 
 def login_user(username: str, password: str):
     debug_requests("login_user")
     try:
-        r = requests.post(f"{AUTH_POP_UP_URL}/login",
+        r = _http.post(f"{AUTH_POP_UP_URL}/login",
                           json={"username": username, "password": password},
-                          verify=VERIFY_SSL, timeout=7)
+                          verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             data = r.json()
             token = data.get("token")
             user = data.get("user", {})
             if token and user:
                 save_session(token, user)
+                _remember_verified(token)
                 return token, user
     except Exception as e:
         print("Login failed:", e)
@@ -123,9 +255,9 @@ def login_user(username: str, password: str):
 def register_user(username: str, password: str):
     debug_requests("register_user")
     try:
-        r = requests.post(f"{AUTH_POP_UP_URL}",
+        r = _http.post(f"{AUTH_POP_UP_URL}",
                           json={"username": username, "password": password},
-                          verify=VERIFY_SSL, timeout=7)
+                          verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code in (200, 201):
             return r.json()
         else:
@@ -145,11 +277,11 @@ def delete_account(user_id: int):
 
         headers = {"Authorization": f"Bearer {token}"}
 
-        r = requests.delete(
+        r = _http.delete(
             f"{AUTH_POP_UP_URL}/{user_id}",
             headers=headers,
             verify=VERIFY_SSL,
-            timeout=7,
+            timeout=REQUEST_TIMEOUT,
         )
 
         if r.status_code == 200:
@@ -176,7 +308,7 @@ def get_workshop_items(name_filter: str = None):
     headers = get_auth_headers()
     params = {"NameFilter": name_filter} if name_filter else {}
     try:
-        r = requests.get(WORKSHOP_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(WORKSHOP_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             data = r.json()
             print(data)
@@ -197,7 +329,7 @@ def get_workshop_item_by_id(item_id: int):
     debug_requests("get_workshop_item_by_id")
     headers = get_auth_headers()
     try:
-        r = requests.get(f"{WORKSHOP_URL}/{item_id}", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(f"{WORKSHOP_URL}/{item_id}", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             return r.json()
         elif r.status_code == 404:
@@ -214,7 +346,7 @@ def create_workshop_item(item_json):
     headers = get_auth_headers()
     headers["Content-Type"] = "application/json"
     try:
-        r = requests.post(WORKSHOP_URL, headers=headers, json=item_json, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(WORKSHOP_URL, headers=headers, json=item_json, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code in (200, 201):
             return r.json()
         else:
@@ -232,7 +364,7 @@ def rate_workshop_item(item_id: int, rating: int):
 
     headers = get_auth_headers()
     try:
-        r = requests.post(f"{WORKSHOP_URL}/{item_id}/rate/{rating}", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(f"{WORKSHOP_URL}/{item_id}/rate/{rating}", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             print("Rating submitted successfully.")
             return True
@@ -251,7 +383,7 @@ def toggle_subscription(item_id: int):
     debug_requests("toggle_subscription")
     headers = get_auth_headers()
     try:
-        r = requests.post(f"{WORKSHOP_URL}/{item_id}/subscribe", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(f"{WORKSHOP_URL}/{item_id}/subscribe", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             print("Subscription toggled successfully.")
             return True
@@ -268,7 +400,7 @@ def is_subscribed(item_id: int):
     debug_requests("is_subscribed")
     headers = get_auth_headers()
     try:
-        r = requests.get(f"{WORKSHOP_URL}/{item_id}/subscribed", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(f"{WORKSHOP_URL}/{item_id}/subscribed", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             return r.json() if r.text.strip().lower() in ["true", "false"] else bool(r.json())
         elif r.status_code == 404:
@@ -339,12 +471,12 @@ def submit_leaderboard(level_name: str, time_seconds: float, node_count: int, co
     }
 
     try:
-        r = requests.post(
+        r = _http.post(
             LEADERBOARD_URL,
             headers=headers,
             json=payload,
             verify=VERIFY_SSL,
-            timeout=7,
+            timeout=REQUEST_TIMEOUT,
         )
 
         if r.status_code in (200, 201):
@@ -384,12 +516,12 @@ def get_leaderboard(level_name: str):
     }
 
     try:
-        r = requests.get(
+        r = _http.get(
             LEADERBOARD_URL,
             headers=headers,
             params=params,
             verify=VERIFY_SSL,
-            timeout=7
+            timeout=REQUEST_TIMEOUT
         )
 
         if r.status_code == 200:
@@ -457,24 +589,16 @@ def debug_requests(request_name):
 
 
 def is_authenticated():
-    try:
-        with open(SESSION_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            token = data.get("token")
-            user = data.get("user", {})
-            if token is not None and user is not None:
-                return True
-    except Exception:
+    data = _get_session_data()
+    if not data:
         return False
+    return data.get("token") is not None and data.get("user", {}) is not None
 
 def get_user():
-    try:
-        with open(SESSION_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            user = data.get("user", {})
-            return user
-    except Exception:
+    data = _get_session_data()
+    if not data:
         return None
+    return data.get("user", {})
 
 def get_username():
     user = get_user()
@@ -498,7 +622,7 @@ def delete_workshop_item(id):
     debug_requests("delete_workshop_item")
     headers = get_auth_headers()
     try:
-        r = requests.delete(f"{WORKSHOP_URL}/{id}", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.delete(f"{WORKSHOP_URL}/{id}", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             print("Workshop item deleted successfully.")
             return True
@@ -515,7 +639,7 @@ def get_lobbies(include_started: bool = False):
     headers = get_auth_headers()
     params = {"includeStarted": include_started}
     try:
-        r = requests.get(LOBBY_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=7)
+        r = _http.get(LOBBY_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             return r.json()
         else:
@@ -531,7 +655,7 @@ def create_lobby(selected_level_id: int, name: str, max_players: int  ,password:
     if password:
         params["password"] = password
     try:
-        r = requests.post(LOBBY_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(LOBBY_URL, headers=headers, params=params, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code in (200, 201):
             print("Lobby created successfully.")
             return r.json()
@@ -546,7 +670,7 @@ def join_lobby(code, password=None):
     headers = get_auth_headers()
     params = {"password": password} if password else {}
     try:
-        r = requests.post(f"{LOBBY_URL}/{code}/join", headers=headers, params=params, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(f"{LOBBY_URL}/{code}/join", headers=headers, params=params, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             print(f"Joined lobby {code} successfully.")
             return True
@@ -562,7 +686,8 @@ hub_connection = None
 
 
 def connect_signalr(on_lobby_created=None, on_player_joined=None, on_player_left=None, on_lobby_deleted=None,
-                    on_player_kicked=None, on_lobby_started=None, on_environment_synced=None, on_node_proposed=None, on_connection_proposed=None,on_delete_proposed=None, on_chat_message_received=None):
+                    on_player_kicked=None, on_lobby_started=None, on_environment_synced=None, on_node_proposed=None, on_connection_proposed=None,on_delete_proposed=None, on_chat_message_received=None,
+                    on_reconnected=None, on_move_proposed=None, on_resync_requested=None):
     global hub_connection
 
     HUB_URL = LOBBY_URL.replace("/lobbies", "/hubs/lobby")
@@ -575,6 +700,12 @@ def connect_signalr(on_lobby_created=None, on_player_joined=None, on_player_left
         hub_connection = (
             HubConnectionBuilder()
             .with_url(f"{HUB_URL}{query_str}", options={"verify_ssl": VERIFY_SSL})
+            .with_automatic_reconnect({
+                "type": "raw",
+                "keep_alive_interval": 10,
+                "reconnect_interval": 5,
+                "max_attempts": 5
+            })
             .build()
         )
 
@@ -598,9 +729,16 @@ def connect_signalr(on_lobby_created=None, on_player_joined=None, on_player_left
             hub_connection.on("ConnectionProposed", lambda args: on_connection_proposed(args[0]))
         if on_delete_proposed:
             hub_connection.on("DeleteProposed", lambda args: on_delete_proposed(args[0]))
+        if on_move_proposed:
+            hub_connection.on("MoveProposed", lambda args: on_move_proposed(args[0]))
+        if on_resync_requested:
+            hub_connection.on("ResyncRequested", lambda args: on_resync_requested(args[0]))
         if on_chat_message_received:
             hub_connection.on("ChatMessageReceived", lambda args: on_chat_message_received(args[0]))
 
+        if on_reconnected:
+            hub_connection.on_reconnect(on_reconnected)
+
         hub_connection.start()
         print("Connected to LobbyHub SignalR")
 
@@ -612,7 +750,7 @@ def leave_lobby(code):
     debug_requests("leave_lobby")
     headers = get_auth_headers()
     try:
-        r = requests.post(f"{LOBBY_URL}/{code}/leave", headers=headers, verify=VERIFY_SSL, timeout=7)
+        r = _http.post(f"{LOBBY_URL}/{code}/leave", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         if r.status_code == 200:
             print(f"Left lobby {code}")
             return True
@@ -626,7 +764,7 @@ def kick_player(code, player_name):
     try:
         headers = get_auth_headers()
         safe_name = urllib.parse.quote(player_name)
-        resp = requests.post(f"{LOBBY_URL}/{code}/kick/{safe_name}", headers=headers)
+        resp = _http.post(f"{LOBBY_URL}/{code}/kick/{safe_name}", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         print("Kick response:", resp.status_code, resp.text)
         if resp.status_code != 200:
             return False
@@ -671,7 +809,7 @@ def disconnect_signalr():
 def start_lobby(code):
     try:
         headers = get_auth_headers()
-        resp = requests.post(f"{LOBBY_URL}/{code}/start", headers=headers, verify=VERIFY_SSL)
+        resp = _http.post(f"{LOBBY_URL}/{code}/start", headers=headers, verify=VERIFY_SSL, timeout=REQUEST_TIMEOUT)
         print("Start lobby response:", resp.status_code, resp.text)
         if resp.status_code != 200:
             return False
@@ -709,6 +847,18 @@ def propose_delete(lobby_code, target_data):
         hub_connection.send("ProposeDelete", [payload])
         print(f"[SignalR] Sent delete proposal → {payload.keys()}")
 
+def propose_move(lobby_code, uid, pos):
+    if hub_connection:
+        payload = {"lobbyCode": lobby_code, "uid": uid, "x": pos.x, "y": pos.y}
+        hub_connection.send("ProposeMove", [payload])
+        print(f"[SignalR] Sent move proposal → {payload}")
+
+def request_state_resync(lobby_code):
+    if hub_connection:
+        payload = {"lobbyCode": lobby_code}
+        hub_connection.send("RequestResync", [payload])
+        print(f"[SignalR] Sent resync request → {payload}")
+
 def send_chat_message(lobby_code, sender, message):
     if not hub_connection:
         return
@@ -721,3 +871,34 @@ UPDATE_EVENT = pygame.USEREVENT + 1
 def trigger_event():
     pygame.event.post(pygame.event.Event(UPDATE_EVENT))
 
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="request_helper")
+_completed = []
+_completed_lock = threading.Lock()
+
+
+def run_async(func, *args, on_done=None, **kwargs):
+    future = _executor.submit(func, *args, **kwargs)
+
+    def finished(f):
+        if on_done:
+            with _completed_lock:
+                _completed.append((on_done, f))
+        trigger_event()
+
+    future.add_done_callback(finished)
+    return future
+
+
+def dispatch_completed():
+    with _completed_lock:
+        completed = list(_completed)
+        _completed.clear()
+    for on_done, future in completed:
+        try:
+            result = future.result()
+        except Exception as e:
+            print("Async request failed:", e)
+            result = None
+        on_done(result)
+
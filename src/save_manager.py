@@ -1,7 +1,19 @@
-import os, json, requests
+import os, json, requests, tempfile, threading, atexit
 
 from Level import Level
 
+WRITE_DELAY = 0.5
+INDEX_FILE = ".save_index"
+
+_progress_cache = None
+_progress_stamp = None
+_progress_path = None
+
+_pending_writes = {}
+_write_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_write_timer = None
+
 
 def get_save_dir(custom_levels=False, workshop_levels=False, workshop_machine=False):
     base = os.path.expanduser("~/Documents")
@@ -15,6 +27,122 @@ def get_save_dir(custom_levels=False, workshop_levels=False, workshop_machine=Fa
     os.makedirs(path, exist_ok=True)
     return path
 
+def _file_stamp(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+def _write_json_atomic(path, text):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def _queue_write(path, data):
+    global _write_timer
+    text = json.dumps(data, separators=(",", ":"))
+    with _write_lock:
+        _pending_writes[path] = text
+        if _write_timer is None:
+            _write_timer = threading.Timer(WRITE_DELAY, flush_writes)
+            _write_timer.daemon = True
+            _write_timer.start()
+
+def _pending_data(path):
+    with _write_lock:
+        text = _pending_writes.get(path)
+    return json.loads(text) if text is not None else None
+
+def _drop_pending(path):
+    with _write_lock:
+        _pending_writes.pop(path, None)
+
+def flush_writes():
+    global _write_timer, _progress_stamp
+    with _flush_lock:
+        with _write_lock:
+            pending = dict(_pending_writes)
+            if _write_timer is not None:
+                _write_timer.cancel()
+                _write_timer = None
+        for path, text in pending.items():
+            try:
+                _write_json_atomic(path, text)
+            except Exception as e:
+                print("Error writing save:", path, e)
+                continue
+            with _write_lock:
+                if _pending_writes.get(path) is text:
+                    del _pending_writes[path]
+                    if path == _progress_path:
+                        _progress_stamp = _file_stamp(path)
+
+atexit.register(flush_writes)
+
+def _machine_summary(data, fallback_name):
+    nodes = data.get("nodes", [])
+    bbox = None
+    if nodes:
+        xs = [n["x"] for n in nodes]
+        ys = [n["y"] for n in nodes]
+        bbox = [min(xs), min(ys), max(xs), max(ys)]
+    return {
+        "name": data.get("name", fallback_name),
+        "nodes": len(nodes),
+        "connections": len(data.get("connections", [])),
+        "bbox": bbox,
+    }
+
+def _level_summary(data, fallback_name):
+    return {
+        "name": data.get("name", fallback_name),
+        "description": data.get("description", ""),
+    }
+
+def _refresh_index(path, summarize):
+    index_path = os.path.join(path, INDEX_FILE)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    entries = {}
+    changed = False
+    for f in os.listdir(path):
+        if not f.endswith(".json"):
+            continue
+        stamp = _file_stamp(os.path.join(path, f))
+        if stamp is None:
+            continue
+        entry = index.get(f)
+        if entry is None or (entry.get("mtime"), entry.get("size")) != stamp:
+            try:
+                with open(os.path.join(path, f), "r", encoding="utf-8") as file:
+                    entry = summarize(json.load(file), f[:-5])
+            except Exception as e:
+                print("Error reading save:", f, e)
+                continue
+            entry["mtime"], entry["size"] = stamp
+            changed = True
+        entries[f] = entry
+
+    if changed or len(entries) != len(index):
+        try:
+            _write_json_atomic(index_path, json.dumps(entries, separators=(",", ":")))
+        except Exception as e:
+            print("Error writing save index:", e)
+    return entries
+
 def list_saves(workshop_levels=False, workshop_machine=False):
     if workshop_levels:
         path = get_save_dir(workshop_levels=True)
@@ -22,41 +150,20 @@ def list_saves(workshop_levels=False, workshop_machine=False):
         path = get_save_dir(workshop_machine=True)
     else:
         path = get_save_dir()
-    saves = []
-    for f in os.listdir(path):
-        if f.endswith(".json"):
-            full_path = os.path.join(path, f)
-            try:
-                with open(full_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    saves.append({"name": data.get("name", f[:-5]), "path": full_path})
-            except Exception as e:
-                print("Error reading save:", f, e)
+    flush_writes()
+    summarize = _level_summary if workshop_levels else _machine_summary
+    saves = [dict(entry, path=os.path.join(path, f)) for f, entry in _refresh_index(path, summarize).items()]
     return sorted(saves, key=lambda s: s["name"])
 
 def list_custom_levels():
     path = get_save_dir(custom_levels=True)
-    levels = []
-    for f in os.listdir(path):
-        if f.endswith(".json"):
-            full_path = os.path.join(path, f)
-            try:
-                with open(full_path, "r", encoding="utf-8") as file:
-                    data = json.load(file)
-                    levels.append({
-                        "name": data.get("name", f[:-5]),
-                        "description": data.get("description", ""),
-                        "path": full_path,
-                        "data": data
-                    })
-            except Exception as e:
-                print("Error reading custom level:", f, e)
+    flush_writes()
+    levels = [dict(entry, path=os.path.join(path, f)) for f, entry in _refresh_index(path, _level_summary).items()]
     return sorted(levels, key=lambda s: s["name"])
 
 def save_machine(name, data):
     path = os.path.join(get_save_dir(), f"{name}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    _queue_write(path, data)
     return path
 
 def load_machine(name, workshop=False):
@@ -64,18 +171,26 @@ def load_machine(name, workshop=False):
         path = os.path.join(get_save_dir(workshop_machine=True), f"{name}.json")
     else:
         path = os.path.join(get_save_dir(), f"{name}.json")
+    pending = _pending_data(path)
+    if pending is not None:
+        return pending
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 def delete_machine(name):
     path = os.path.join(get_save_dir(), f"{name}.json")
+    _drop_pending(path)
     if os.path.exists(path):
         os.remove(path)
 
 def delete_progress():
+    global _progress_cache, _progress_stamp
     path = get_progress_path()
+    _drop_pending(path)
     if os.path.exists(path):
         os.remove(path)
+    _progress_cache = None
+    _progress_stamp = None
 
 def get_progress_path():
     base = os.path.expanduser(r"~/Documents/Turing Sandbox Saves/progress")
@@ -87,17 +202,29 @@ def get_progress_path():
     return path
 
 def load_progress():
+    global _progress_cache, _progress_stamp, _progress_path
     path = get_progress_path()
+    _progress_path = path
+    with _write_lock:
+        stamp = _file_stamp(path)
+        if _progress_cache is not None and (stamp == _progress_stamp or path in _pending_writes):
+            return _progress_cache
+
     with open(path, "r", encoding="utf-8") as f:
         try:
-            return json.load(f)
+            progress = json.load(f)
         except json.JSONDecodeError:
-            return {}
+            progress = {}
+    _progress_cache = progress
+    _progress_stamp = stamp
+    return progress
 
 def save_progress(progress):
+    global _progress_cache, _progress_path
     path = get_progress_path()
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(progress, f, indent=4)
+    _progress_path = path
+    _queue_write(path, progress)
+    _progress_cache = progress
 
 def mark_level_complete(level_name, solution=None, time=None):
     progress = load_progress()
@@ -133,8 +260,7 @@ def get_level_stats(level_name):
 
 def save_workshop_level(level: Level):
     path = os.path.join(get_save_dir(workshop_levels=True), f"{level.name}.json")
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(level.to_dict(), f, indent=4)
+    _write_json_atomic(path, json.dumps(level.to_dict(), separators=(",", ":")))
 
 
 def save_workshop_machine(item):
@@ -156,8 +282,7 @@ def save_workshop_machine(item):
         return None
     os.makedirs(base_dir, exist_ok=True)
     full_path = os.path.join(base_dir, f"{name}.json")
-    with open(full_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    _queue_write(full_path, data)
     return full_path
 
 def delete_workshop_item(name, is_level=False):
@@ -165,5 +290,6 @@ def delete_workshop_item(name, is_level=False):
         path = os.path.join(get_save_dir(workshop_levels=True), f"{name}.json")
     else:
         path = os.path.join(get_save_dir(workshop_machine=True), f"{name}.json")
+    _drop_pending(path)
     if os.path.exists(path):
         os.remove(path)
@@ -0,0 +1,195 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from TapeBuffer import TapeBuffer
+
+BLANK = "_"
+DEFAULT_MAX_STEPS = 5000
+POOL_WORKERS = max(1, min(4, (os.cpu_count() or 2) - 1))
+
+_pool = None
+
+
+def compile_machine(machine_data, double_tape=False):
+    nodes = {}
+    start = None
+    for ndata in machine_data.get("nodes", []):
+        key = ndata.get("uid", ndata["id"])
+        nodes[key] = ndata
+        if start is None and ndata.get("is_start", False):
+            start = key
+
+    transitions = {}
+    for order, cdata in enumerate(machine_data.get("connections", [])):
+        source = cdata.get("start_uid", cdata.get("start"))
+        target = cdata.get("end_uid", cdata.get("end"))
+        if source not in nodes or target not in nodes:
+            continue
+        rule = (order, target, cdata.get("write"), cdata.get("move"), cdata.get("write2"), cdata.get("move2"))
+        read2 = cdata.get("read2") or []
+        for s1 in cdata.get("read") or []:
+            if not double_tape:
+                transitions.setdefault((source, s1), rule)
+            elif not read2:
+                transitions.setdefault((source, s1, None), rule)
+            else:
+                for s2 in read2:
+                    transitions.setdefault((source, s1, s2), rule)
+
+    return {
+        "start": start,
+        "end": {node_id for node_id, ndata in nodes.items() if ndata.get("is_end", False)},
+        "transitions": transitions,
+        "double_tape": double_tape,
+    }
+
+
+def _find_rule(machine, state, s1, s2):
+    transitions = machine["transitions"]
+    if not machine["double_tape"]:
+        return transitions.get((state, s1))
+
+    exact = transitions.get((state, s1, s2))
+    wildcard = transitions.get((state, s1, None))
+    if exact and wildcard:
+        return min(exact, wildcard)
+    return exact or wildcard
+
+
+def _load_tape(tape_string):
+    tape = TapeBuffer(tape_string, BLANK)
+    head = tape.first_non_blank()
+    return tape, head if head is not None else 0
+
+
+def _move(head, move):
+    if move == "L":
+        return head - 1
+    if move == "R":
+        return head + 1
+    return head
+
+
+def run(machine, input_string, max_steps=DEFAULT_MAX_STEPS):
+    tape, head = _load_tape(input_string)
+    tape2, head2 = TapeBuffer(blank=BLANK), 0
+    state = machine["start"]
+    double = machine["double_tape"]
+    steps = 0
+    seen = {}
+    candidate = None
+    reason = "no start state" if state is None else None
+
+    while reason is None:
+        if state in machine["end"]:
+            reason = "halted"
+            break
+        if steps >= max_steps:
+            reason = "step limit"
+            break
+
+        if candidate is not None and steps == candidate[1]:
+            if candidate[0] == (state, head, head2, tape.snapshot(), tape2.snapshot()):
+                reason = "cycle"
+                break
+            candidate = None
+
+        configuration = (state, head, tape.content_hash, head2, tape2.content_hash)
+        previous = seen.get(configuration)
+        if previous is not None and candidate is None:
+            candidate = ((state, head, head2, tape.snapshot(), tape2.snapshot()), steps + steps - previous)
+        seen[configuration] = steps
+
+        s1 = tape.read(head)
+        s2 = tape2.read(head2) if double else None
+        rule = _find_rule(machine, state, s1, s2)
+        if rule is None:
+            reason = "no transition"
+            break
+
+        _, target, write, move, write2, move2 = rule
+        if write:
+            tape.write(head, write)
+        if double and write2:
+            tape2.write(head2, write2)
+        head = _move(head, move)
+        if double:
+            head2 = _move(head2, move2)
+        state = target
+        steps += 1
+
+    return {
+        "accepted": reason == "halted",
+        "halted": reason in ("halted", "no transition", "no start state"),
+        "output": (tape2 if double else tape).to_string(),
+        "steps": steps,
+        "reason": reason,
+    }
+
+
+def run_batch(machine_data, inputs, double_tape=False, max_steps=DEFAULT_MAX_STEPS):
+    machine = compile_machine(machine_data, double_tape)
+    return [run(machine, input_string, max_steps) for input_string in inputs]
+
+
+def level_cases(level):
+    if level.mode == "accept":
+        cases = [(example, False) for example in level.wrong_examples]
+        cases += [(example, True) for example in level.correct_examples]
+        return cases
+    return [(case["input"], case["output"]) for case in level.transform_tests]
+
+
+def grade_case(machine, mode, case, max_steps=DEFAULT_MAX_STEPS):
+    input_string, expected = case
+    result = run(machine, input_string, max_steps)
+    if mode == "accept":
+        passed = machine["start"] is not None and result["accepted"] == expected
+    else:
+        passed = result["halted"] and result["output"] == expected
+    return _report(input_string, passed, result)
+
+
+def grade_cases(machine_data, double_tape, mode, cases, max_steps=DEFAULT_MAX_STEPS):
+    machine = compile_machine(machine_data, double_tape)
+    return [grade_case(machine, mode, case, max_steps) for case in cases]
+
+
+def grade_level(machine_data, level):
+    max_steps = getattr(level, "max_steps", None) or DEFAULT_MAX_STEPS
+    return grade_cases(machine_data, bool(level.double_tape), level.mode, level_cases(level), max_steps)
+
+
+def get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+def submit_level(machine_data, level):
+    max_steps = getattr(level, "max_steps", None) or DEFAULT_MAX_STEPS
+    cases = level_cases(level)
+    chunk = max(1, len(cases) // (POOL_WORKERS * 4))
+    pool = get_pool()
+    return [
+        pool.submit(grade_cases, machine_data, bool(level.double_tape), level.mode, cases[i:i + chunk], max_steps)
+        for i in range(0, len(cases), chunk)
+    ]
+
+
+def _report(input_string, passed, result):
+    return {
+        "input": input_string,
+        "passed": passed,
+        "steps": result["steps"],
+        "reason": result["reason"],
+    }